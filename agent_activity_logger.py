@@ -48,6 +48,16 @@ class ActivityLog:
             self.timestamp = datetime.now().isoformat()
         if self.start_time is None:
             self.start_time = time.time()
+    
+    def finish(self, status: ActivityStatus, description: Optional[str] = None, details: Optional[Dict[str, Any]] = None):
+        """Mark the activity finished with the given status"""
+        self.status = status
+        self.end_time = time.time()
+        self.duration = self.end_time - self.start_time
+        if description:
+            self.description = description
+        if details:
+            self.details.update(details)
 
 class AgentActivityLogger:
     """Beautiful agent activity logger with real-time updates"""
@@ -83,6 +93,27 @@ class AgentActivityLogger:
         self._update_display()
         return activity_id
     
+    def create_activity(self,
+                        activity_type: ActivityType,
+                        title: str,
+                        description: str,
+                        details: Optional[Dict[str, Any]] = None) -> ActivityLog:
+        """Create an activity without recording it; pass it to log_activities once finished"""
+        return ActivityLog(
+            id=str(uuid.uuid4())[:8],
+            type=activity_type,
+            status=ActivityStatus.STARTED,
+            title=title,
+            description=description,
+            details=details or {}
+        )
+    
+    def log_activities(self, activities: List[ActivityLog]):
+        """Record a batch of finished activities with a single display update"""
+        if activities:
+            st.session_state.activity_logs.extend(activities)
+            self._update_display()
+    
     def update_activity(self, 
                        activity_id: str, 
                        status: Optional[ActivityStatus] = None,
@@ -17,6 +17,7 @@ class NodeConfigManager:
         
         self.config_path = config_path
         self.config = self._load_config()
+        self._node_index = None
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML file."""
@@ -38,6 +39,12 @@ class NodeConfigManager:
         """Get all node configurations."""
         return self.config["nodes"]
     
+    def get_node_index(self) -> Dict[str, int]:
+        """Get a small stable integer for each node (its position in the file), for completion bitmasks."""
+        if self._node_index is None:
+            self._node_index = {node_id: i for i, node_id in enumerate(self.config["nodes"])}
+        return self._node_index
+    
     def get_workflow_config(self) -> Dict[str, Any]:
         """Get workflow-level configuration."""
         return self.config.get("workflow", {})
@@ -105,6 +112,7 @@ class NodeConfigManager:
     def reload_config(self):
         """Reload configuration from file."""
         self.config = self._load_config()
+        self._node_index = None
 
 
 # Global instance for easy access
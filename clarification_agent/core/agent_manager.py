@@ -161,7 +161,7 @@ class ClarificationAgentManager:
             ]
             
             # Call the LLM
-            response = llm._call_openrouter(messages)
+            response = llm._call_openrouter(messages, temperature=0, model=llm.models["structured"])
             
             if response:
                 # Extract just the node name from the response
@@ -118,7 +118,7 @@ class ClarityValidator:
                 {"role": "user", "content": prompt}
             ]
             
-            response = self.llm_helper._call_openrouter(messages, temperature=0.3)
+            response = self.llm_helper._call_openrouter(messages, temperature=0.3, model=self.llm_helper.models["structured"])
             
             if response:
                 # Extract number from response
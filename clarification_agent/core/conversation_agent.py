@@ -2,12 +2,31 @@
 Conversation-driven Clarification Agent using LangGraph.
 """
 import os
+import re
 import json
 import yaml
 from typing import Dict, Any, List, Tuple, Optional, TypedDict
 from langgraph.graph import StateGraph, END
 from clarification_agent.models.project import Project
-from clarification_agent.utils.llm_helper import LLMHelper
+from clarification_agent.utils.llm_helper import LLMHelper, JSON_OBJECT_FORMAT, extract_json
+
+# Words in a reply that signal the conversation is wrapping up, matched in one pass
+_COMPLETION_RE = re.compile(r"complete|summary|finish", re.IGNORECASE)
+
+# Question prompt for each perspective stage
+_PERSPECTIVE_PROMPTS = {
+    "product_manager": "Ask about the most important features for the MVP",
+    "business_analyst": "Ask about target users and market fit",
+    "tech_lead": "Ask about technical constraints and requirements",
+    "ux_designer": "Ask about user journeys and workflows",
+    "qa_engineer": "Ask about critical functionality and edge cases",
+}
+
+# Terse extraction instructions; fewer input tokens on every conversation turn
+_EXTRACT_INSTRUCTIONS = (
+    "Output JSON with only the fields mentioned: description (string); "
+    "mvp_features, excluded_features, tech_stack (string arrays). No prose."
+)
 
 # Define the state schema
 class ConversationState(TypedDict):
@@ -43,6 +62,10 @@ class ConversationAgent:
         # Initialize conversation history
         self.conversation_history = []
         
+        # Perspective questions, generated together for the current description
+        self._perspective_questions = {}
+        self._perspective_questions_for = None
+        
         # Define agent roles/perspectives
         self.perspectives = [
             "product_manager",  # Focus on user needs and product features
@@ -99,14 +122,15 @@ class ConversationAgent:
             
             # Define a wrapper generator that collects the full response
             def process_stream():
-                full_response = ""
+                chunks = []
                 for chunk in response_generator:
-                    full_response += chunk
+                    chunks.append(chunk)
                     yield chunk
+                full_response = "".join(chunks)
                 
                 # After collecting the full response, process it
                 is_complete = False
-                if "complete" in full_response.lower() or "summary" in full_response.lower() or "finish" in full_response.lower():
+                if _COMPLETION_RE.search(full_response):
                     self.complete = True
                     self._generate_output_files()
                     is_complete = True
@@ -115,32 +139,35 @@ class ConversationAgent:
                 self.conversation_history.append({"role": "assistant", "content": full_response})
                 
                 # Update project data based on the conversation
-                self._update_project_from_conversation()
+                with self.llm.request_scope():
+                    self._update_project_from_conversation()
                 
                 # Return completion status with the last chunk
                 return is_complete
             
             return process_stream(), False
         else:
-            # For non-streaming, return the full response
-            response = self._generate_dynamic_response(user_input)
+            # Identical LLM requests within this turn are only sent once
+            with self.llm.request_scope():
+                # For non-streaming, return the full response
+                response = self._generate_dynamic_response(user_input)
             
-            # Check if we should complete the conversation
-            is_complete = False
-            if "complete" in response.lower() or "summary" in response.lower() or "finish" in response.lower():
-                self.complete = True
-                self._generate_output_files()
-                summary = self._get_stage_message("summarize")
-                self.conversation_history.append({"role": "assistant", "content": summary})
-                return summary, True
+                # Check if we should complete the conversation
+                is_complete = False
+                if _COMPLETION_RE.search(response):
+                    self.complete = True
+                    self._generate_output_files()
+                    summary = self._get_stage_message("summarize")
+                    self.conversation_history.append({"role": "assistant", "content": summary})
+                    return summary, True
             
-            # Add the response to conversation history
-            self.conversation_history.append({"role": "assistant", "content": response})
+                # Add the response to conversation history
+                self.conversation_history.append({"role": "assistant", "content": response})
             
-            # Update project data based on the conversation
-            self._update_project_from_conversation()
+                # Update project data based on the conversation
+                self._update_project_from_conversation()
             
-            return response, False
+                return response, False
         
     def _generate_dynamic_response(self, user_input: str, stream: bool = False):
         """
@@ -184,19 +211,20 @@ class ConversationAgent:
             
             # Add project state to system message if we have any information
             if any(project_state.values()):
-                system_message += "\n\nCurrent project state:\n"
+                state_lines = ["\n\nCurrent project state:\n"]
                 if project_state["description"]:
-                    system_message += f"- Description: {project_state['description']}\n"
+                    state_lines.append(f"- Description: {project_state['description']}\n")
                 if project_state["mvp_features"]:
-                    system_message += f"- MVP Features: {', '.join(project_state['mvp_features'])}\n"
+                    state_lines.append(f"- MVP Features: {', '.join(project_state['mvp_features'])}\n")
                 if project_state["excluded_features"]:
-                    system_message += f"- Excluded Features: {', '.join(project_state['excluded_features'])}\n"
+                    state_lines.append(f"- Excluded Features: {', '.join(project_state['excluded_features'])}\n")
                 if project_state["tech_stack"]:
-                    system_message += f"- Tech Stack: {', '.join(project_state['tech_stack'])}\n"
+                    state_lines.append(f"- Tech Stack: {', '.join(project_state['tech_stack'])}\n")
                 if project_state["file_map"]:
-                    system_message += "- File structure has been defined\n"
+                    state_lines.append("- File structure has been defined\n")
                 if project_state["tasks"]:
-                    system_message += "- Development tasks have been defined\n"
+                    state_lines.append("- Development tasks have been defined\n")
+                system_message += "".join(state_lines)
             
             # Create messages for the LLM
             messages = [
@@ -231,15 +259,12 @@ class ConversationAgent:
             # Build a prompt for the LLM
             system_message = "You are an AI assistant helping to extract project information from a conversation."
             
-            user_message = "Based on the conversation, extract relevant project information.\n\n"
-            user_message += "Conversation:\n"
-            user_message += "\n".join([f"{msg['role'].capitalize()}: {msg['content']}" for msg in recent_messages])
-            
-            user_message += "\n\nRespond with a JSON object containing these fields (only if mentioned in the conversation):\n"
-            user_message += "- description: Project description\n"
-            user_message += "- mvp_features: Array of MVP features\n"
-            user_message += "- excluded_features: Array of features to exclude from MVP\n"
-            user_message += "- tech_stack: Array of technologies\n"
+            conversation_text = "\n".join(f"{msg['role'].capitalize()}: {msg['content']}" for msg in recent_messages)
+            user_message = "\n\n".join([
+                "Based on the conversation, extract relevant project information.",
+                f"Conversation:\n{conversation_text}",
+                _EXTRACT_INSTRUCTIONS
+            ])
             
             # Create messages for the LLM
             messages = [
@@ -248,20 +273,12 @@ class ConversationAgent:
             ]
             
             # Call the LLM
-            response = self.llm._call_openrouter(messages)
+            response = self.llm._call_openrouter(
+                messages, temperature=0, model=self.llm.models["structured"], response_format=JSON_OBJECT_FORMAT
+            )
             
             if response:
-                # Extract JSON from the response if needed
-                import json
-                import re
-                
-                json_str = response
-                if '```json' in response:
-                    json_str = response.split('```json')[1].split('```')[0].strip()
-                elif '```' in response:
-                    json_str = response.split('```')[1].split('```')[0].strip()
-                    
-                updates = json.loads(json_str)
+                updates = extract_json(response)
                 
                 # Update project fields
                 if 'description' in updates and updates['description'] and not self.project.description:
@@ -357,19 +374,16 @@ class ConversationAgent:
             # Build a prompt for the LLM
             system_message = "You are an AI assistant helping to determine the next step in a project clarification conversation."
             
-            user_message = "Based on the conversation history and current project state, determine the most appropriate next stage.\n\n"
-            user_message += "Current project state:\n"
-            for key, value in project_state.items():
-                user_message += f"- {key}: {value}\n"
-            
-            user_message += "\nRecent conversation:\n"
-            user_message += "\n".join(conversation_context)
-            
-            user_message += "\n\nAvailable stages:\n"
-            for stage, description in available_stages.items():
-                user_message += f"- {stage}: {description}\n"
-            
-            user_message += "\nRespond with only the name of the next stage to execute."
+            user_message = "".join([
+                "Based on the conversation history and current project state, determine the most appropriate next stage.\n\n",
+                "Current project state:\n",
+                *(f"- {key}: {value}\n" for key, value in project_state.items()),
+                "\nRecent conversation:\n",
+                "\n".join(conversation_context),
+                "\n\nAvailable stages:\n",
+                *(f"- {stage}: {description}\n" for stage, description in available_stages.items()),
+                "\nRespond with only the name of the next stage to execute."
+            ])
             
             # Create messages for the LLM
             messages = [
@@ -378,12 +392,13 @@ class ConversationAgent:
             ]
             
             # Call the LLM
-            response = self.llm._call_openrouter(messages)
+            response = self.llm._call_openrouter(messages, temperature=0, model=self.llm.models["structured"])
             
             if response:
                 # Extract just the stage name from the response
+                lower_response = response.lower()
                 for stage in available_stages.keys():
-                    if stage.lower() in response.lower():
+                    if stage.lower() in lower_response:
                         return stage
             
             # If LLM fails or returns invalid stage, use heuristics
@@ -407,6 +422,15 @@ class ConversationAgent:
             # If we have all the essential information, move to summary
             return "summarize"
     
+    def _perspective_question(self, perspective: str) -> str:
+        """Get the question for a perspective stage, batching all perspectives into one LLM call"""
+        if self._perspective_questions_for != self.project.description:
+            self._perspective_questions = self.llm.generate_suggestions_multi(
+                _PERSPECTIVE_PROMPTS, {"description": self.project.description}
+            )
+            self._perspective_questions_for = self.project.description
+        return self._perspective_questions[perspective]
+    
     def _get_stage_message(self, stage: str) -> str:
         """Get the message for a specific stage"""
         if stage == "clarify_project":
@@ -417,10 +441,7 @@ class ConversationAgent:
             )
         
         elif stage == "product_manager":
-            return self.llm.generate_suggestions(
-                "Ask about the most important features for the MVP",
-                {"perspective": "product_manager", "description": self.project.description}
-            )
+            return self._perspective_question("product_manager")
         
         elif stage == "scope_reduction":
             return (
@@ -430,10 +451,7 @@ class ConversationAgent:
             )
         
         elif stage == "business_analyst":
-            return self.llm.generate_suggestions(
-                "Ask about target users and market fit",
-                {"perspective": "business_analyst", "description": self.project.description}
-            )
+            return self._perspective_question("business_analyst")
         
         elif stage == "tech_selection":
             tech_suggestions = self.llm.generate_suggestions(
@@ -449,10 +467,7 @@ class ConversationAgent:
             )
         
         elif stage == "tech_lead":
-            return self.llm.generate_suggestions(
-                "Ask about technical constraints and requirements",
-                {"perspective": "tech_lead", "description": self.project.description}
-            )
+            return self._perspective_question("tech_lead")
         
         elif stage == "file_mapping":
             file_structure = self.llm.generate_file_structure(self.project.dict())
@@ -465,10 +480,7 @@ class ConversationAgent:
             )
         
         elif stage == "ux_designer":
-            return self.llm.generate_suggestions(
-                "Ask about user journeys and workflows",
-                {"perspective": "ux_designer", "description": self.project.description}
-            )
+            return self._perspective_question("ux_designer")
         
         elif stage == "task_planning":
             tasks = self.llm.generate_tasks(self.project.dict())
@@ -481,10 +493,7 @@ class ConversationAgent:
             )
         
         elif stage == "qa_engineer":
-            return self.llm.generate_suggestions(
-                "Ask about critical functionality and edge cases",
-                {"perspective": "qa_engineer", "description": self.project.description}
-            )
+            return self._perspective_question("qa_engineer")
         
         elif stage == "summarize":
             project_data = self.project.dict()
@@ -110,6 +110,32 @@ class DatabaseManager:
         conn.close()
         return results
 
+# Heuristic vocabularies, built once at import
+_AMBIGUOUS_KEYWORDS = (
+    'some', 'many', 'few', 'several', 'approximately', 'around',
+    'fast', 'slow', 'big', 'small', 'good', 'bad', 'nice',
+    'user-friendly', 'efficient', 'robust', 'scalable'
+)
+
+_MISSING_INFO_PATTERNS = (
+    (re.compile(r'database'), "What type of database? (SQL/NoSQL, specific technology?)"),
+    (re.compile(r'api'), "What API specifications? (REST/GraphQL, authentication method?)"),
+    (re.compile(r'user'), "What type of users? (roles, permissions, user groups?)"),
+    (re.compile(r'integration'), "Which systems to integrate with? (specific APIs, data formats?)")
+)
+
+_RISK_INDICATORS = {
+    'complexity': frozenset({'complex', 'advanced', 'sophisticated', 'multiple'}),
+    'integration': frozenset({'integrate', 'third-party', 'external', 'api'}),
+    'scalability': frozenset({'scale', 'growth', 'expand', 'large'}),
+    'security': frozenset({'secure', 'authentication', 'authorization', 'privacy'}),
+    'performance': frozenset({'fast', 'real-time', 'performance', 'speed'})
+}
+
+def _preview(text: str, length: int = 50) -> str:
+    """Leading slice of a requirement, for messages."""
+    return f"{text[:length]}..."
+
 # Core Agent Logic
 class ClarificationAgent:
     def __init__(self, db_manager: DatabaseManager):
@@ -155,32 +181,21 @@ class ClarificationAgent:
         """Detect ambiguous requirements"""
         ambiguities = []
         
-        ambiguous_keywords = [
-            'some', 'many', 'few', 'several', 'approximately', 'around',
-            'fast', 'slow', 'big', 'small', 'good', 'bad', 'nice',
-            'user-friendly', 'efficient', 'robust', 'scalable'
-        ]
-        
         for req in requirements:
-            for keyword in ambiguous_keywords:
-                if keyword in req.text.lower():
-                    ambiguities.append(f"'{keyword}' in requirement: {req.text[:50]}...")
+            lower_text = req.text.lower()
+            for keyword in _AMBIGUOUS_KEYWORDS:
+                if keyword in lower_text:
+                    ambiguities.append(f"'{keyword}' in requirement: {_preview(req.text)}")
                     req.clarifications_needed.append(f"Please clarify what '{keyword}' means specifically")
         
         # Check for missing information
-        missing_info_patterns = [
-            (r'database', "What type of database? (SQL/NoSQL, specific technology?)"),
-            (r'api', "What API specifications? (REST/GraphQL, authentication method?)"),
-            (r'user', "What type of users? (roles, permissions, user groups?)"),
-            (r'integration', "Which systems to integrate with? (specific APIs, data formats?)")
-        ]
-        
         for req in requirements:
-            for pattern, question in missing_info_patterns:
-                if re.search(pattern, req.text.lower()):
+            lower_text = req.text.lower()
+            for pattern, question in _MISSING_INFO_PATTERNS:
+                if pattern.search(lower_text):
                     if question not in req.clarifications_needed:
                         req.clarifications_needed.append(question)
-                        ambiguities.append(f"Missing specification in: {req.text[:50]}...")
+                        ambiguities.append(f"Missing specification in: {_preview(req.text)}")
         
         return list(set(ambiguities))
     
@@ -245,18 +260,11 @@ class ClarificationAgent:
         """Assess project risks"""
         risks = []
         
-        risk_indicators = {
-            'complexity': ['complex', 'advanced', 'sophisticated', 'multiple'],
-            'integration': ['integrate', 'third-party', 'external', 'api'],
-            'scalability': ['scale', 'growth', 'expand', 'large'],
-            'security': ['secure', 'authentication', 'authorization', 'privacy'],
-            'performance': ['fast', 'real-time', 'performance', 'speed']
-        }
-        
         for req in requirements:
-            for risk_type, indicators in risk_indicators.items():
-                if any(indicator in req.text.lower() for indicator in indicators):
-                    risks.append(f"{risk_type.title()} risk: {req.text[:50]}...")
+            lower_text = req.text.lower()
+            for risk_type, indicators in _RISK_INDICATORS.items():
+                if any(indicator in lower_text for indicator in indicators):
+                    risks.append(f"{risk_type.title()} risk: {_preview(req.text)}")
         
         return list(set(risks))
 
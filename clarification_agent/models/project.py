@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, List, Optional, Any, Tuple
 
 class Project(BaseModel):
     """
@@ -20,9 +20,33 @@ class Project(BaseModel):
     purpose: str = ""
     constraints: List[str] = Field(default_factory=list)
     
+    # Bumped whenever a field is reassigned; keys the cached dict() result
+    _version: int = PrivateAttr(default=0)
+    _dict_cache: Optional[Tuple[int, Dict[str, Any]]] = PrivateAttr(default=None)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            super().__setattr__("_version", self._version + 1)
+    
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "Project":
+        copied = super().model_copy(update=update, deep=deep)
+        # update= bypasses __setattr__, so the copied dict() cache may be stale
+        copied._dict_cache = None
+        return copied
+    
     def dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization"""
-        return {
+        """
+        Convert to dictionary for serialization.
+        
+        The result shares its lists and dicts with the model, so in-place edits
+        stay visible and it only needs rebuilding when a field is reassigned.
+        Treat it as read-only.
+        """
+        if self._dict_cache is not None and self._dict_cache[0] == self._version:
+            return self._dict_cache[1]
+        
+        data = {
             "project": self.name,
             "goals": self.goals,
             "mvp_features": self.mvp_features,
@@ -36,6 +60,8 @@ class Project(BaseModel):
             "purpose": self.purpose,
             "constraints": self.constraints
         }
+        self._dict_cache = (self._version, data)
+        return data
     
     def load_from_dict(self, data: Dict[str, Any]):
         """Load project data from a dictionary"""
@@ -1,7 +1,22 @@
 from typing import Dict, Any, List
 from clarification_agent.nodes.base_node import BaseNode
 from clarification_agent.models.project import Project
-from clarification_agent.utils.llm_helper import LLMHelper
+from clarification_agent.utils.llm_helper import LLMHelper, JSON_OBJECT_FORMAT, extract_json
+
+# Terse output instructions appended to the prompts; fewer input tokens per call
+_UI_INSTRUCTIONS = "Output JSON {title, description, questions: [{id, question, type, required}]}. No prose."
+_UPDATE_INSTRUCTIONS = "Output JSON of only the project fields to update. No prose."
+
+def _format_project_state(project_state: Dict[str, Any]) -> str:
+    """Project state block shared by the node prompts."""
+    return "".join([
+        "Current project state:\\n",
+        f"- Name: {project_state.get('name', 'Not provided')}\\n",
+        f"- Description: {project_state.get('description', 'Not provided')}\\n",
+        f"- MVP Features: {project_state.get('mvp_features', [])}\\n",
+        f"- Excluded Features: {project_state.get('excluded_features', [])}\\n",
+        f"- Tech Stack: {project_state.get('tech_stack', [])}\\n"
+    ])
 
 class DynamicNode(BaseNode):
     """
@@ -35,15 +50,12 @@ class DynamicNode(BaseNode):
         # Build a prompt for the LLM
         system_message = "You are an AI assistant helping to generate questions for a project clarification workflow."
         
-        user_message = f"Generate questions for the '{self.node_type}' stage of project clarification.\\n\\n"
-        user_message += "Current project state:\\n"
-        user_message += f"- Name: {project_state.get('name', 'Not provided')}\\n"
-        user_message += f"- Description: {project_state.get('description', 'Not provided')}\\n"
-        user_message += f"- MVP Features: {project_state.get('mvp_features', [])}\\n"
-        user_message += f"- Excluded Features: {project_state.get('excluded_features', [])}\\n"
-        user_message += f"- Tech Stack: {project_state.get('tech_stack', [])}\\n"
-        
-        user_message += "\\nRespond with a JSON object containing 'title', 'description', and 'questions' array. Each question should have 'id', 'question', 'type', and 'required' fields."
+        user_message = "".join([
+            f"Generate questions for the '{self.node_type}' stage of project clarification.\\n\\n",
+            _format_project_state(project_state),
+            "\\n",
+            _UI_INSTRUCTIONS
+        ])
         
         # Create messages for the LLM
         messages = [
@@ -52,22 +64,14 @@ class DynamicNode(BaseNode):
         ]
         
         # Call the LLM
-        response = self.llm._call_openrouter(messages)
+        response = self.llm._call_openrouter(
+            messages, temperature=0, model=self.llm.models["structured"], response_format=JSON_OBJECT_FORMAT
+        )
         
         # Parse the response or use fallback
         try:
             if response:
-                # Extract JSON from the response if needed
-                import json
-                import re
-                
-                json_str = response
-                if '```json' in response:
-                    json_str = response.split('```json')[1].split('```')[0].strip()
-                elif '```' in response:
-                    json_str = response.split('```')[1].split('```')[0].strip()
-                    
-                ui_data = json.loads(json_str)
+                ui_data = extract_json(response)
                 
                 # Ensure required fields are present
                 if 'title' not in ui_data:
@@ -106,20 +110,14 @@ class DynamicNode(BaseNode):
         # Build a prompt for the LLM to process responses
         system_message = "You are an AI assistant helping to update project state based on user responses."
         
-        user_message = f"Process user responses for the '{self.node_type}' stage and extract relevant information to update the project state.\\n\\n"
-        user_message += "Current project state:\\n"
-        project_state = project.dict()
-        user_message += f"- Name: {project_state.get('name', 'Not provided')}\\n"
-        user_message += f"- Description: {project_state.get('description', 'Not provided')}\\n"
-        user_message += f"- MVP Features: {project_state.get('mvp_features', [])}\\n"
-        user_message += f"- Excluded Features: {project_state.get('excluded_features', [])}\\n"
-        user_message += f"- Tech Stack: {project_state.get('tech_stack', [])}\\n"
-        
-        user_message += "\\nUser responses:\\n"
-        for key, value in responses.items():
-            user_message += f"- {key}: {value}\\n"
-            
-        user_message += "\\nRespond with a JSON object containing updated project fields. Only include fields that should be updated."
+        user_message = "".join([
+            f"Process user responses for the '{self.node_type}' stage and extract relevant information to update the project state.\\n\\n",
+            _format_project_state(project.dict()),
+            "\\nUser responses:\\n",
+            *(f"- {key}: {value}\\n" for key, value in responses.items()),
+            "\\n",
+            _UPDATE_INSTRUCTIONS
+        ])
         
         # Create messages for the LLM
         messages = [
@@ -128,22 +126,14 @@ class DynamicNode(BaseNode):
         ]
         
         # Call the LLM
-        response = self.llm._call_openrouter(messages)
+        response = self.llm._call_openrouter(
+            messages, temperature=0, model=self.llm.models["structured"], response_format=JSON_OBJECT_FORMAT
+        )
         
         # Parse the response and update project
         try:
             if response:
-                # Extract JSON from the response if needed
-                import json
-                import re
-                
-                json_str = response
-                if '```json' in response:
-                    json_str = response.split('```json')[1].split('```')[0].strip()
-                elif '```' in response:
-                    json_str = response.split('```')[1].split('```')[0].strip()
-                    
-                updates = json.loads(json_str)
+                updates = extract_json(response)
                 
                 # Update project fields
                 if 'description' in updates and updates['description']:
@@ -1,7 +1,21 @@
+import re
 from typing import Dict, Any
 from clarification_agent.nodes.base_node import BaseNodeHandler
 from clarification_agent.models.project import Project
-from clarification_agent.utils.llm_helper import LLMHelper
+
+# Title, file, estimate and an optional, possibly signed, integer priority; comment lines are skipped
+_TASK_RE = re.compile(r"^(?!#)([^:]*):([^:]*):([^:]*):\s*(?:([+-]?\d+)\s*(?=:|$))?")
+
+# Shared LLM helper, created on first use
+_llm_helper = None
+
+def _get_llm_helper():
+    """Get the shared LLMHelper instance, importing it lazily."""
+    global _llm_helper
+    if _llm_helper is None:
+        from clarification_agent.utils.llm_helper import LLMHelper
+        _llm_helper = LLMHelper()
+    return _llm_helper
 
 class TaskPlannerNode(BaseNodeHandler):
     """
@@ -33,39 +47,29 @@ class TaskPlannerNode(BaseNodeHandler):
     
     def process_responses(self, project: Project, responses: Dict[str, Any]) -> None:
         """Process responses for the TaskPlanner node"""
-        # Clear existing tasks
-        project.tasks = []
-        
-        # Process tasks
+        # Process tasks: "Title: file: estimate: priority", one per line
         tasks_text = responses.get("tasks", "")
-        lines = tasks_text.split("\\n")
-        
-        for line in lines:
-            if ":" in line and not line.startswith("#"):
-                parts = [part.strip() for part in line.split(":")]
-                
-                if len(parts) >= 4:
-                    title, file_path, estimate, priority = parts[:4]
-                    
-                    try:
-                        priority_num = int(priority)
-                    except ValueError:
-                        priority_num = 3  # Default priority
-                    
-                    project.tasks.append({
-                        "title": title,
-                        "file": file_path,
-                        "estimate": estimate,
-                        "priority": priority_num
-                    })
+        project.tasks = [
+            {
+                "title": m.group(1).strip(),
+                "file": m.group(2).strip(),
+                "estimate": m.group(3).strip(),
+                "priority": int(m.group(4)) if m.group(4) else 3  # Default priority
+            }
+            for line in tasks_text.split("\\n")
+            if (m := _TASK_RE.match(line))
+        ]
     
     def _generate_suggested_tasks(self, project: Project) -> str:
         """Generate suggested tasks based on features and file map using AI"""
-        tasks = "# AI-suggested tasks (edit as needed):\\n"
+        tasks = ["# AI-suggested tasks (edit as needed):\\n"]
         
         # Use AI to generate tasks
-        llm_helper = LLMHelper()
-        ai_tasks = llm_helper.generate_tasks(project.dict())
+        ai_tasks = []
+        try:
+            ai_tasks = _get_llm_helper().generate_tasks(project.dict())
+        except Exception as e:
+            print(f"Error generating tasks with LLM: {e}")
         
         # Convert AI tasks to the expected format
         for task in ai_tasks:
@@ -74,12 +78,18 @@ class TaskPlannerNode(BaseNodeHandler):
             estimate = task.get("estimate", "1h")
             priority = task.get("priority", 3)
             
-            tasks += f"{title}: {file_path}: {estimate}: {priority}\\n"
+            tasks.append(f"{title}: {file_path}: {estimate}: {priority}\\n")
         
         # Add basic tasks if AI didn't provide enough
         if len(ai_tasks) < 3:
-            tasks += "Project setup: README.md: 0.5h: 1\\n"
-            tasks += "Create project structure: : 1h: 1\\n"
-            tasks += "Documentation: README.md: 1h: 5\\n"
+            tasks.append(self._fallback_suggested_tasks(project))
         
-        return tasks
\ No newline at end of file
+        return "".join(tasks)
+    
+    def _fallback_suggested_tasks(self, project: Project) -> str:
+        """Basic tasks used when the AI suggestions are missing or too few"""
+        return (
+            "Project setup: README.md: 0.5h: 1\\n"
+            "Create project structure: : 1h: 1\\n"
+            "Documentation: README.md: 1h: 5\\n"
+        )
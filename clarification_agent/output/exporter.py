@@ -1,9 +1,31 @@
 import os
 import json
+import hashlib
 import yaml
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
 from clarification_agent.models.project import Project
 
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _YamlDumper
+
+# Write buffer size for exported files
+_BUFFER_SIZE = 65536
+
+# Document templates, formatted once per export
+_README_HEADER = "# {name}\n\n{description}\n\n{purpose}\n\n## 🧠 Features (MVP)\n\n"
+_README_TECH_STACK = "\n## 🔧 Tech Stack\n\n"
+_README_EXCLUDED = "\n## ❌ Not Included\n\n"
+_README_STRUCTURE = "\n## 📁 Project Structure\n\n"
+_README_FOOTER = "\n> Created with Clarifier Agent.\n"
+_ARCH_HEADER = "# {name} - Architecture\n\n## Overview\n\n{description}\n\n## Design Decisions\n\n"
+_ARCH_STRUCTURE = "## File Structure\n\n"
+
+# Digests of the inputs behind each exported file, used to skip rewrites
+_HASHES_PATH = os.path.join(".clarity", ".export_hashes")
+
 class Exporter:
     """
     Handles exporting project data to various file formats.
@@ -11,24 +33,69 @@ class Exporter:
     
     def __init__(self, project: Project):
         self.project = project
+        self._last_hashes = self._load_hashes()
+    
+    def _load_hashes(self) -> Dict[str, str]:
+        """Load the input digests recorded by the previous export"""
+        try:
+            with open(_HASHES_PATH, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def _save_hashes(self):
+        """Persist the input digests for the next export"""
+        with open(_HASHES_PATH, "w") as f:
+            json.dump(self._last_hashes, f, indent=2)
+    
+    def _changed_digest(self, path: str, *inputs: Any) -> Optional[str]:
+        """
+        Return the digest of an export's inputs, or None when the file at
+        path already exists and was written from identical inputs.
+        """
+        payload = json.dumps(inputs, sort_keys=True, default=str).encode()
+        digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        if self._last_hashes.get(path) == digest and os.path.exists(path):
+            return None
+        return digest
     
     def export_all(self):
         """Export all project files"""
-        self.export_clarity_json()
-        self.export_plan_yml()
-        self.export_readme()
-        self.export_architecture_md()
+        # Create the output directory up front so the writers don't race on it
+        os.makedirs(".clarity", exist_ok=True)
+        
+        # The files are independent, so let their writes overlap
+        exports = [
+            self.export_clarity_json,
+            self.export_plan_yml,
+            self.export_readme,
+            self.export_architecture_md,
+        ]
+        with ThreadPoolExecutor(max_workers=len(exports)) as executor:
+            list(executor.map(lambda export: export(), exports))
+        
+        self._save_hashes()
         # MCP implementation is excluded from MVP as per requirements
     
     def export_clarity_json(self):
         """Export project data to .clarity/project.json"""
         os.makedirs(".clarity", exist_ok=True)
         
-        with open(os.path.join(".clarity", f"{self.project.name}.json"), "w") as f:
+        path = os.path.join(".clarity", f"{self.project.name}.json")
+        digest = self._changed_digest(path, self.project.dict())
+        if digest is None:
+            return
+        
+        with open(path, "w", buffering=_BUFFER_SIZE) as f:
             json.dump(self.project.dict(), f, indent=2)
+        self._last_hashes[path] = digest
     
     def export_plan_yml(self):
         """Export tasks to .plan.yml"""
+        digest = self._changed_digest(".plan.yml", self.project.tasks)
+        if digest is None:
+            return
+        
         plan_data = {
             "plan": [
                 {
@@ -41,69 +108,71 @@ class Exporter:
             ]
         }
         
-        with open(".plan.yml", "w") as f:
-            yaml.dump(plan_data, f, default_flow_style=False)
+        with open(".plan.yml", "w", buffering=_BUFFER_SIZE) as f:
+            yaml.dump(plan_data, f, Dumper=_YamlDumper, default_flow_style=False)
+        self._last_hashes[".plan.yml"] = digest
     
     def export_readme(self):
         """Export README.md"""
-        readme_content = f"""# {self.project.name}
-
-{self.project.description or ''}
-
-{self.project.purpose or ''}
-
-## 🧠 Features (MVP)
-
-"""
-        
-        # Add MVP features
-        for feature in self.project.mvp_features:
-            readme_content += f"- {feature}\n"
-        
-        # Add tech stack
-        if self.project.tech_stack:
-            readme_content += "\n## 🔧 Tech Stack\n\n"
-            for tech in self.project.tech_stack:
-                readme_content += f"- {tech}\n"
-        
-        # Add excluded features
-        if self.project.excluded_features:
-            readme_content += "\n## ❌ Not Included\n\n"
-            for feature in self.project.excluded_features:
-                readme_content += f"- {feature}\n"
+        project = self.project
         
-        # Add project structure
-        if self.project.file_map:
-            readme_content += "\n## 📁 Project Structure\n\n"
-            for file_path, description in self.project.file_map.items():
-                readme_content += f"- `{file_path}`: {description}\n"
-        
-        readme_content += "\n> Created with Clarifier Agent.\n"
+        # Hash the project fields the README is built from, not the rendered text
+        digest = self._changed_digest(
+            "README.md",
+            project.name, project.description, project.purpose,
+            project.mvp_features, project.tech_stack,
+            project.excluded_features, project.file_map
+        )
+        if digest is None:
+            return
         
         with open("README.md", "w") as f:
-            f.write(readme_content)
+            f.write(_README_HEADER.format(
+                name=project.name,
+                description=project.description or '',
+                purpose=project.purpose or ''
+            ))
+            
+            # Add MVP features
+            f.writelines(f"- {feature}\n" for feature in project.mvp_features)
+            
+            # Add tech stack
+            if project.tech_stack:
+                f.write(_README_TECH_STACK)
+                f.writelines(f"- {tech}\n" for tech in project.tech_stack)
+            
+            # Add excluded features
+            if project.excluded_features:
+                f.write(_README_EXCLUDED)
+                f.writelines(f"- {feature}\n" for feature in project.excluded_features)
+            
+            # Add project structure
+            if project.file_map:
+                f.write(_README_STRUCTURE)
+                f.writelines(f"- `{file_path}`: {description}\n" for file_path, description in project.file_map.items())
+            
+            f.write(_README_FOOTER)
+        self._last_hashes["README.md"] = digest
     
     def export_architecture_md(self):
         """Export architecture.md"""
-        arch_content = f"""# {self.project.name} - Architecture
-
-## Overview
-
-{self.project.description or ''}
-
-## Design Decisions
-
-"""
-        
-        # Add decisions
-        for decision, reasoning in self.project.decisions.items():
-            arch_content += f"### {decision}\n\n{reasoning}\n\n"
+        project = self.project
         
-        # Add file structure
-        if self.project.file_map:
-            arch_content += "## File Structure\n\n"
-            for file_path, description in self.project.file_map.items():
-                arch_content += f"- `{file_path}`: {description}\n"
+        digest = self._changed_digest(
+            "architecture.md",
+            project.name, project.description, project.decisions, project.file_map
+        )
+        if digest is None:
+            return
         
         with open("architecture.md", "w") as f:
-            f.write(arch_content)
\ No newline at end of file
+            f.write(_ARCH_HEADER.format(name=project.name, description=project.description or ''))
+            
+            # Add decisions
+            f.writelines(f"### {decision}\n\n{reasoning}\n\n" for decision, reasoning in project.decisions.items())
+            
+            # Add file structure
+            if project.file_map:
+                f.write(_ARCH_STRUCTURE)
+                f.writelines(f"- `{file_path}`: {description}\n" for file_path, description in project.file_map.items())
+        self._last_hashes["architecture.md"] = digest
\ No newline at end of file
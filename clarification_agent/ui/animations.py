@@ -2,12 +2,14 @@
 Simple CSS animations for enhanced UI experience.
 Modular component that can be injected into existing Streamlit apps.
 """
+import re
+
 import streamlit as st
 
 
-def inject_chat_animations():
-    """Inject CSS animations into the current Streamlit app."""
-    st.markdown("""
+# Minified once at import; Streamlit drops elements that are not re-emitted
+# on a rerun, so the stylesheet itself still has to be sent on every run.
+_CSS = re.sub(r"\s+", " ", """
     <style>
     /* Fade-in animation for new messages */
     .fade-in {
@@ -53,7 +55,12 @@ def inject_chat_animations():
         51%, 100% { opacity: 0.3; }
     }
     </style>
-    """, unsafe_allow_html=True)
+""").strip()
+
+
+def inject_chat_animations():
+    """Inject CSS animations into the current Streamlit app."""
+    st.markdown(_CSS, unsafe_allow_html=True)
 
 
 def show_typing_indicator(message="Processing..."):
@@ -2,9 +2,59 @@
 Simple process tracking component that extends existing functionality.
 Reuses session state and integrates with existing ConversationAgent.
 """
+import time
+from collections import deque
+from dataclasses import dataclass
 import streamlit as st
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+
+@dataclass(slots=True)
+class LLMCall:
+    """A logged LLM call."""
+    timestamp: float
+    # Prompt text, or (node label, user input) formatted only when displayed
+    prompt_source: Union[str, Tuple[str, str]]
+    response: str
+    model: str
+    tokens: int
+    
+    @property
+    def prompt(self) -> str:
+        """The prompt as displayed."""
+        if isinstance(self.prompt_source, tuple):
+            label, user_input = self.prompt_source
+            return _trunc(f"Node: {label}, Input: {user_input}", 200)
+        return self.prompt_source
+
+
+@dataclass(slots=True)
+class Citation:
+    """A web citation gathered during processing."""
+    url: str
+    title: str
+    snippet: str
+    timestamp: float
+    source: str = "Unknown"
+
+
+@dataclass(slots=True)
+class Step:
+    """The processing step currently in progress."""
+    name: str
+    timestamp: float
+
+
+def format_timestamp(timestamp: Union[float, str]) -> str:
+    """Format a raw event timestamp as HH:MM:SS for display."""
+    if isinstance(timestamp, str):
+        return timestamp
+    return time.strftime("%H:%M:%S", time.localtime(timestamp))
+
+
+def _trunc(text: str, limit: int) -> str:
+    """Cut text to limit characters, marking the cut with an ellipsis."""
+    return text if len(text) <= limit else text[:limit] + "..."
 
 
 class ProcessTracker:
@@ -14,58 +64,75 @@ class ProcessTracker:
     def initialize():
         """Initialize process tracking in session state."""
         if "process_tracker" not in st.session_state:
-            st.session_state.process_tracker = {
-                "llm_calls": [],
-                "citations": [],
-                "clarity_scores": {},
-                "current_step": None
-            }
+            ProcessTracker.reset()
     
     @staticmethod
-    def log_llm_call(prompt: str, response: str, model: str = "deepseek"):
-        """Log an LLM call."""
+    def reset():
+        """Start a fresh process tracker, discarding recorded events."""
+        # Bounded buffers: only the most recent calls/citations are kept
+        st.session_state.process_tracker = {
+            "llm_calls": deque(maxlen=5),
+            "citations": deque(maxlen=3),
+            # Session-wide running totals, kept up to date as events are logged
+            "total_calls": 0,
+            "total_tokens": 0,
+            "total_citations": 0,
+            "clarity_scores": {},
+            "current_step": None
+        }
+    
+    @staticmethod
+    def log_llm_call(prompt: Union[str, Tuple[str, str]], response: str, model: str = "deepseek"):
+        """Log an LLM call.
+
+        prompt may be a (node label, user input) pair; the display text is
+        then only built if the call is shown.
+        """
         ProcessTracker.initialize()
         
-        call_data = {
-            "timestamp": datetime.now().strftime("%H:%M:%S"),
-            "prompt": prompt[:200] + "..." if len(prompt) > 200 else prompt,
-            "response": response[:200] + "..." if len(response) > 200 else response,
-            "model": model,
-            "tokens": len(prompt.split()) + len(response.split())
-        }
+        if isinstance(prompt, tuple):
+            label, user_input = prompt
+            prompt_source = (label, user_input[:200])
+            prompt_length = len(label) + len(user_input)
+        else:
+            prompt_source = _trunc(prompt, 200)
+            prompt_length = len(prompt)
         
-        st.session_state.process_tracker["llm_calls"].append(call_data)
+        call_data = LLMCall(
+            timestamp=time.time(),
+            prompt_source=prompt_source,
+            response=_trunc(response, 200),
+            model=model,
+            # Rough estimate: ~4 characters per token
+            tokens=(prompt_length + len(response)) // 4
+        )
         
-        # Keep only last 5 calls to save memory
-        if len(st.session_state.process_tracker["llm_calls"]) > 5:
-            st.session_state.process_tracker["llm_calls"].pop(0)
+        tracker = st.session_state.process_tracker
+        tracker["llm_calls"].append(call_data)
+        tracker["total_calls"] += 1
+        tracker["total_tokens"] += call_data.tokens
     
     @staticmethod
     def add_citation(url: str, title: str, snippet: str):
         """Add a web citation."""
         ProcessTracker.initialize()
         
-        citation = {
-            "url": url,
-            "title": title,
-            "snippet": snippet[:150] + "..." if len(snippet) > 150 else snippet,
-            "timestamp": datetime.now().strftime("%H:%M:%S")
-        }
-        
-        st.session_state.process_tracker["citations"].append(citation)
+        citation = Citation(
+            url=url,
+            title=title,
+            snippet=_trunc(snippet, 150),
+            timestamp=time.time()
+        )
         
-        # Keep only last 3 citations
-        if len(st.session_state.process_tracker["citations"]) > 3:
-            st.session_state.process_tracker["citations"].pop(0)
+        tracker = st.session_state.process_tracker
+        tracker["citations"].append(citation)
+        tracker["total_citations"] += 1
     
     @staticmethod
     def set_current_step(step_name: str):
         """Set the current processing step."""
         ProcessTracker.initialize()
-        st.session_state.process_tracker["current_step"] = {
-            "name": step_name,
-            "timestamp": datetime.now().strftime("%H:%M:%S")
-        }
+        st.session_state.process_tracker["current_step"] = Step(name=step_name, timestamp=time.time())
     
     @staticmethod
     def render_sidebar_summary():
@@ -83,7 +150,7 @@ class ProcessTracker:
                 st.metric("Citations", len(tracker["citations"]))
             
             if tracker["current_step"]:
-                st.sidebar.info(f"**Current:** {tracker['current_step']['name']}")
+                st.sidebar.info(f"**Current:** {tracker['current_step'].name}")
     
     @staticmethod
     def render_expandable_details():
@@ -93,20 +160,24 @@ class ProcessTracker:
         
         with st.expander("🔍 Process Details", expanded=False):
             # Recent LLM Calls
+            # Each section goes out as one element rather than one per entry
             if tracker["llm_calls"]:
-                st.markdown("**Recent LLM Calls:**")
-                for call in tracker["llm_calls"][-2:]:  # Show last 2
-                    st.markdown(f"- {call['timestamp']} - {call['model']} ({call['tokens']} tokens)")
-                    with st.expander(f"Call details", expanded=False):
-                        st.text(f"Prompt: {call['prompt']}")
-                        st.text(f"Response: {call['response']}")
+                recent_calls = list(tracker["llm_calls"])[-2:]  # Show last 2
+                st.markdown("**Recent LLM Calls:**\n\n" + "\n".join(
+                    f"- {format_timestamp(call.timestamp)} - {call.model} ({call.tokens} tokens)"
+                    for call in recent_calls
+                ))
+                st.code("\n\n".join(
+                    f"Prompt: {call.prompt}\nResponse: {call.response}"
+                    for call in recent_calls
+                ), language="text")
             
             # Citations
             if tracker["citations"]:
-                st.markdown("**Web Citations:**")
-                for citation in tracker["citations"]:
-                    st.markdown(f"- [{citation['title']}]({citation['url']})")
-                    st.caption(citation['snippet'])
+                st.markdown("**Web Citations:**\n\n" + "\n".join(
+                    f"- [{citation.title}]({citation.url})  \n  {citation.snippet}"
+                    for citation in tracker["citations"]
+                ))
     
     @staticmethod
     def get_stats():
@@ -115,7 +186,7 @@ class ProcessTracker:
         tracker = st.session_state.process_tracker
         
         return {
-            "total_calls": len(tracker["llm_calls"]),
-            "total_citations": len(tracker["citations"]),
-            "total_tokens": sum(call.get("tokens", 0) for call in tracker["llm_calls"])
+            "total_calls": tracker["total_calls"],
+            "total_citations": tracker["total_citations"],
+            "total_tokens": tracker["total_tokens"]
         }
\ No newline at end of file
@@ -3,10 +3,42 @@ Enhanced visualizations for the Clarification Agent.
 Provides interactive workflow visualization and progress tracking.
 """
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 from typing import Dict, Any, List, Optional
 from clarification_agent.config.node_config import get_node_config_manager
+from clarification_agent.ui.process_tracker import format_timestamp
+
+# Flowchart node colors by status
+_ACTIVE_COLOR = '#FF5722'  # Active - Orange/Red
+_COMPLETED_COLOR = '#4CAF50'  # Completed - Green
+_PENDING_COLOR = '#E0E0E0'  # Pending - Gray
+
+# Static flowchart layout
+_FLOWCHART_LAYOUT = dict(
+    title="Workflow Progress",
+    showlegend=False,
+    height=200,
+    margin=dict(l=20, r=20, t=40, b=40),
+    xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+    yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)'
+)
+
+# Node config flags shown as capabilities, with their display labels
+_CAPABILITY_LABELS = (
+    ('optional', "Optional"),
+    ('retry', "Retryable"),
+    ('skip', "Skippable"),
+    ('web_search', "Web Search Enabled"),
+)
+
+# Column tooltips for the statistics dashboard
+_STATS_COLUMN_CONFIG = {
+    "🤖 LLM Calls": st.column_config.Column(help="Total number of LLM API calls made"),
+    "📚 Citations": st.column_config.Column(help="Web search results and citations found"),
+    "🔤 Tokens Used": st.column_config.Column(help="Estimated total tokens processed"),
+    "⏱️ Duration": st.column_config.Column(help="Session duration"),
+}
 
 
 class WorkflowVisualizer:
@@ -14,77 +46,91 @@ class WorkflowVisualizer:
     
     def __init__(self):
         self.config_manager = get_node_config_manager()
+        self._config = None
+        self._sync_config()
+    
+    def _sync_config(self) -> None:
+        """Rebuild the cached node lookups if the configuration was (re)loaded."""
+        config = self.config_manager.config
+        if config is self._config:
+            return
+        
+        self._config = config
+        self._node_order = tuple(self.config_manager.get_node_order())
+        self._nodes_config = self.config_manager.get_all_nodes()
+        self._order_index = {node_id: i for i, node_id in enumerate(self._node_order)}
+        # Each node's bit in a completed-nodes mask
+        node_index = self.config_manager.get_node_index()
+        self._node_bits = tuple(1 << node_index[node_id] for node_id in self._node_order)
+        self._flow_skeleton = None
     
     def render_progress_bar(self, current_node: str) -> None:
         """Render an animated progress bar showing workflow progress."""
-        node_order = self.config_manager.get_node_order()
+        self._sync_config()
         
-        if current_node not in node_order:
+        current_index = self._order_index.get(current_node)
+        if current_index is None:
             return
         
-        current_index = node_order.index(current_node)
-        total_nodes = len(node_order)
+        total_nodes = len(self._node_order)
         progress = (current_index + 1) / total_nodes
         
-        # Create progress bar with custom styling
-        st.markdown(f"""
-        <div style="margin: 10px 0;">
-            <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
-                <span style="font-weight: bold;">Workflow Progress</span>
-                <span style="color: #666;">Step {current_index + 1} of {total_nodes}</span>
-            </div>
-            <div style="width: 100%; background-color: #e0e0e0; border-radius: 10px; height: 20px; overflow: hidden;">
-                <div style="width: {progress * 100}%; background: linear-gradient(90deg, #4CAF50, #81C784); height: 100%; border-radius: 10px; transition: width 0.3s ease;"></div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Show current node info
-        node_config = self.config_manager.get_node_config(current_node)
-        st.info(f"**{node_config['emoji']} {node_config['label']}**: {node_config['purpose']}")
+        # Single native progress element, labelled with the current node
+        node_config = self._nodes_config[current_node]
+        st.progress(
+            progress,
+            text=(
+                f"Workflow Progress · Step {current_index + 1} of {total_nodes}  \n"
+                f"**{node_config['emoji']} {node_config['label']}**: {node_config['purpose']}"
+            )
+        )
     
-    def render_workflow_flowchart(self, current_node: str, completed_nodes: set) -> None:
-        """Render an interactive flowchart of the workflow."""
-        nodes_config = self.config_manager.get_all_nodes()
-        node_order = self.config_manager.get_node_order()
-        
-        # Prepare data for Plotly
-        node_labels = []
-        node_colors = []
-        node_positions_x = []
-        node_positions_y = []
-        
-        # Create a horizontal flow layout
-        for i, node_id in enumerate(node_order):
-            node_config = nodes_config[node_id]
-            node_labels.append(f"{node_config['emoji']} {node_config['label']}")
+    def _get_flow_skeleton(self) -> tuple:
+        """Build (once per config) the parts of the flowchart that don't depend on progress."""
+        if self._flow_skeleton is None:
+            node_order = self._node_order
             
-            # Color based on status
-            if node_id == current_node:
-                node_colors.append('#FF5722')  # Active - Orange/Red
-            elif node_id in completed_nodes:
-                node_colors.append('#4CAF50')  # Completed - Green
-            else:
-                node_colors.append('#E0E0E0')  # Pending - Gray
+            # Create a horizontal flow layout
+            node_labels = tuple(
+                f"{self._nodes_config[node_id]['emoji']} {self._nodes_config[node_id]['label']}"
+                for node_id in node_order
+            )
+            node_positions_x = tuple(i * 2 for i in range(len(node_order)))
+            node_positions_y = (0,) * len(node_order)
+            
+            # Create edges for connections: line from each node to the next
+            edge_x = []
+            edge_y = []
+            for i in range(len(node_order) - 1):
+                edge_x.extend([i * 2, (i + 1) * 2, None])
+                edge_y.extend([0, 0, None])
             
-            # Position nodes horizontally
-            node_positions_x.append(i * 2)
-            node_positions_y.append(0)
+            self._flow_skeleton = (node_labels, node_positions_x, node_positions_y, tuple(edge_x), tuple(edge_y))
         
-        # Create edges for connections
-        edge_x = []
-        edge_y = []
+        return self._flow_skeleton
+    
+    def render_workflow_flowchart(self, current_node: str, completed_mask: int) -> None:
+        """Render an interactive flowchart of the workflow.
+
+        completed_mask has bit get_node_index()[node_id] set for each completed node.
+        """
+        self._sync_config()
+        node_labels, node_positions_x, node_positions_y, edge_x, edge_y = self._get_flow_skeleton()
         
-        for i in range(len(node_order) - 1):
-            # Line from current node to next
-            edge_x.extend([i * 2, (i + 1) * 2, None])
-            edge_y.extend([0, 0, None])
+        # Only the colors change with progress
+        node_colors = [
+            _ACTIVE_COLOR if node_id == current_node
+            else _COMPLETED_COLOR if completed_mask & bit
+            else _PENDING_COLOR
+            for node_id, bit in zip(self._node_order, self._node_bits)
+        ]
         
-        # Create the plot
-        fig = go.Figure()
+        # Create the plot; plotly is only imported once a flowchart is drawn
+        import plotly.graph_objects as go
+        fig = go.Figure(layout=_FLOWCHART_LAYOUT)
         
         # Add edges
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=edge_x, y=edge_y,
             mode='lines',
             line=dict(width=2, color='#CCCCCC'),
@@ -93,7 +139,7 @@ class WorkflowVisualizer:
         ))
         
         # Add nodes
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=node_positions_x, y=node_positions_y,
             mode='markers+text',
             marker=dict(
@@ -108,18 +154,6 @@ class WorkflowVisualizer:
             showlegend=False
         ))
         
-        # Update layout
-        fig.update_layout(
-            title="Workflow Progress",
-            showlegend=False,
-            height=200,
-            margin=dict(l=20, r=20, t=40, b=40),
-            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)'
-        )
-        
         st.plotly_chart(fig, use_container_width=True)
     
     def render_node_details_tabs(self, node_id: str, process_data: Dict[str, Any]) -> None:
@@ -133,21 +167,14 @@ class WorkflowVisualizer:
             st.write(f"**Purpose**: {node_config['purpose']}")
             
             # Show clarity rules
-            if node_config.get('clarity_rules'):
+            clarity_rules = node_config.get('clarity_rules')
+            if clarity_rules:
                 st.markdown("**Clarity Rules**:")
-                for rule in node_config['clarity_rules']:
+                for rule in clarity_rules:
                     st.write(f"- {rule['type']}: {rule.get('message', 'Custom validation')}")
             
             # Show node capabilities
-            capabilities = []
-            if node_config.get('optional'):
-                capabilities.append("Optional")
-            if node_config.get('retry'):
-                capabilities.append("Retryable")
-            if node_config.get('skip'):
-                capabilities.append("Skippable")
-            if node_config.get('web_search'):
-                capabilities.append("Web Search Enabled")
+            capabilities = [label for key, label in _CAPABILITY_LABELS if node_config.get(key)]
             
             if capabilities:
                 st.markdown(f"**Capabilities**: {', '.join(capabilities)}")
@@ -155,19 +182,19 @@ class WorkflowVisualizer:
         with tabs[1]:  # LLM Calls
             llm_calls = process_data.get('llm_calls', [])
             if llm_calls:
-                st.markdown("**Recent LLM Interactions**:")
-                for i, call in enumerate(llm_calls[-3:], 1):  # Show last 3
-                    with st.expander(f"Call {i} - {call.get('timestamp', 'Unknown time')}", expanded=i == 1):
-                        st.markdown("**Prompt**:")
-                        st.code(call.get('prompt', 'No prompt recorded'), language='text')
-                        st.markdown("**Response**:")
-                        st.code(call.get('response', 'No response recorded'), language='text')
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.metric("Model", call.get('model', 'Unknown'))
-                        with col2:
-                            st.metric("Tokens", call.get('tokens', 0))
+                recent_calls = list(llm_calls)[-3:]  # Show last 3
+                # One markdown block for the transcripts and one table for the
+                # metadata, instead of an expander with four elements per call
+                st.markdown("**Recent LLM Interactions**:\n\n" + "\n\n".join(
+                    f"**Call {i} - {format_timestamp(call.timestamp)}**\n\n"
+                    f"Prompt:\n```text\n{call.prompt or 'No prompt recorded'}\n```\n\n"
+                    f"Response:\n```text\n{call.response or 'No response recorded'}\n```"
+                    for i, call in enumerate(recent_calls, 1)
+                ))
+                st.table([
+                    {"Call": i, "Model": call.model, "Tokens": call.tokens}
+                    for i, call in enumerate(recent_calls, 1)
+                ])
             else:
                 st.info("No LLM calls recorded for this session")
         
@@ -176,13 +203,12 @@ class WorkflowVisualizer:
             if citations:
                 st.markdown("**Web Search Results & Citations**:")
                 for citation in citations:
-                    with st.expander(f"📄 {citation.get('title', 'Untitled')}", expanded=False):
-                        st.markdown(f"**URL**: [{citation.get('url', 'No URL')}]({citation.get('url', '#')})")
-                        st.markdown(f"**Source**: {citation.get('source', 'Unknown')}")
+                    with st.expander(f"📄 {citation.title or 'Untitled'}", expanded=False):
+                        st.markdown(f"**URL**: [{citation.url}]({citation.url})")
+                        st.markdown(f"**Source**: {citation.source}")
                         st.markdown("**Snippet**:")
-                        st.write(citation.get('snippet', 'No content available'))
-                        if citation.get('timestamp'):
-                            st.caption(f"Retrieved: {citation['timestamp']}")
+                        st.write(citation.snippet or 'No content available')
+                        st.caption(f"Retrieved: {format_timestamp(citation.timestamp)}")
             else:
                 st.info("No citations available")
         
@@ -235,31 +261,30 @@ class WorkflowVisualizer:
                 st.write(project_data.get('description', 'No description available'))
             
             with col2:
-                st.markdown("**⭐ MVP Features**")
                 features = project_data.get('mvp_features', [])
                 if features:
-                    for feature in features[:5]:  # Show first 5
-                        st.write(f"• {feature}")
+                    # One bulleted markdown element per list
+                    st.markdown("**⭐ MVP Features**\n\n" + "\n".join(
+                        f"- {feature}" for feature in features[:5]  # Show first 5
+                    ))
                     if len(features) > 5:
                         st.caption(f"... and {len(features) - 5} more")
                 else:
-                    st.write("No features specified")
+                    st.markdown("**⭐ MVP Features**\n\nNo features specified")
             
             with col3:
-                st.markdown("**🛠️ Tech Stack**")
                 tech_stack = project_data.get('tech_stack', [])
                 if tech_stack:
-                    for tech in tech_stack:
-                        st.write(f"• {tech}")
+                    st.markdown("**🛠️ Tech Stack**\n\n" + "\n".join(f"- {tech}" for tech in tech_stack))
                 else:
-                    st.write("No technologies specified")
+                    st.markdown("**🛠️ Tech Stack**\n\nNo technologies specified")
             
             # Excluded features
             excluded = project_data.get('excluded_features', [])
             if excluded:
-                st.markdown("**🚫 Excluded from MVP**")
-                for item in excluded[:3]:  # Show first 3
-                    st.write(f"• {item}")
+                st.markdown("**🚫 Excluded from MVP**\n\n" + "\n".join(
+                    f"- {item}" for item in excluded[:3]  # Show first 3
+                ))
                 if len(excluded) > 3:
                     st.caption(f"... and {len(excluded) - 3} more exclusions")
     
@@ -267,57 +292,42 @@ class WorkflowVisualizer:
         """Render a statistics dashboard."""
         st.markdown("### 📊 Session Statistics")
         
-        # Calculate statistics
-        total_llm_calls = len(process_data.get('llm_calls', []))
-        total_citations = len(process_data.get('citations', []))
-        total_tokens = sum(call.get('tokens', 0) for call in process_data.get('llm_calls', []))
+        # Running totals maintained by ProcessTracker, so no pass over the calls
+        total_llm_calls = process_data.get('total_calls', 0)
+        total_citations = process_data.get('total_citations', 0)
+        total_tokens = process_data.get('total_tokens', 0)
         
-        # Display metrics
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric(
-                label="🤖 LLM Calls",
-                value=total_llm_calls,
-                help="Total number of LLM API calls made"
-            )
-        
-        with col2:
-            st.metric(
-                label="📚 Citations",
-                value=total_citations,
-                help="Web search results and citations found"
-            )
+        # Simple duration indicator
+        duration = "Active" if total_llm_calls >= 2 else "< 1 min"
         
-        with col3:
-            st.metric(
-                label="🔤 Tokens Used",
-                value=f"{total_tokens:,}",
-                help="Estimated total tokens processed"
-            )
-        
-        with col4:
-            # Calculate session duration if timestamps available
-            llm_calls = process_data.get('llm_calls', [])
-            if len(llm_calls) >= 2:
-                # Simple duration calculation
-                st.metric(
-                    label="⏱️ Duration",
-                    value="Active",
-                    help="Session is currently active"
-                )
-            else:
-                st.metric(
-                    label="⏱️ Duration",
-                    value="< 1 min",
-                    help="Session duration"
-                )
+        # All four metrics go out as a single one-row table
+        st.dataframe(
+            [{
+                "🤖 LLM Calls": total_llm_calls,
+                "📚 Citations": total_citations,
+                "🔤 Tokens Used": f"{total_tokens:,}",
+                "⏱️ Duration": duration
+            }],
+            hide_index=True,
+            column_config=_STATS_COLUMN_CONFIG
+        )
+
+
+# Shared visualizer, created on first use
+_visualizer = None
+
+def get_workflow_visualizer() -> WorkflowVisualizer:
+    """Get the shared workflow visualizer instance."""
+    global _visualizer
+    if _visualizer is None:
+        _visualizer = WorkflowVisualizer()
+    return _visualizer
 
 
 # Convenience functions for easy integration
-def render_enhanced_workflow_sidebar(current_node: str, completed_nodes: set, process_data: Dict[str, Any]):
+def render_enhanced_workflow_sidebar(current_node: str, completed_mask: int, process_data: Dict[str, Any]):
     """Render enhanced workflow visualization in sidebar."""
-    visualizer = WorkflowVisualizer()
+    visualizer = get_workflow_visualizer()
     
     st.sidebar.markdown("## 🗺️ Workflow")
     visualizer.render_progress_bar(current_node)
@@ -327,12 +337,12 @@ def render_enhanced_workflow_sidebar(current_node: str, completed_nodes: set, pr
 
 def render_enhanced_process_details(current_node: str, process_data: Dict[str, Any]):
     """Render enhanced process details with tabs."""
-    visualizer = WorkflowVisualizer()
+    visualizer = get_workflow_visualizer()
     
     with st.expander("🔍 Enhanced Process Details", expanded=False):
         visualizer.render_node_details_tabs(current_node, process_data)
 
 def render_project_completion_summary(project_data: Dict[str, Any]):
     """Render project completion summary."""
-    visualizer = WorkflowVisualizer()
+    visualizer = get_workflow_visualizer()
     visualizer.render_project_summary_card(project_data)
\ No newline at end of file
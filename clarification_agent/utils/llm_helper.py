@@ -1,23 +1,352 @@
 import os
-from typing import List, Dict, Any
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Any, Iterator, Mapping, Optional, Tuple, Union
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Load environment variables
 load_dotenv()
 
-class LLMHelper:
-    """A streamlined helper class for interacting with language models."""
+# Connection settings, read once at import
+_OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+_API_KEY = os.getenv("OPENAI_API_KEY")
+DEFAULT_MODEL = "moonshotai/kimi-dev-72b:free"
+# Optional smaller, faster model for structured (JSON / one-word) replies
+_STRUCTURED_MODEL = os.getenv("LLM_STRUCTURED_MODEL")
 
-    def __init__(self, model_name: str = "moonshotai/kimi-dev-72b:free"):
-        """Initializes the LLM helper with a specified model."""
-        self.llm = ChatOpenAI(
-           base_url="https://openrouter.ai/api/v1",
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON, using orjson when it is installed."""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    # Same bytes orjson would produce, so cache keys match either way
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+# Request format asking the provider for a bare JSON object reply
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+# First fenced block in a reply, with or without a "json" tag
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.+?)\s*```", re.DOTALL)
+
+def extract_json(text: str) -> Any:
+    """Parse JSON from a model reply: bare, fenced, or embedded in prose."""
+    try:
+        return _json_loads(text)
+    except ValueError:
+        pass
+    match = _FENCE_RE.search(text)
+    if match:
+        try:
+            return _json_loads(match.group(1))
+        except ValueError:
+            pass
+    # Fall back to the outermost object or array in the text
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise ValueError("No JSON found in response")
+    start = min(starts)
+    end = text.rfind("}" if text[start] == "{" else "]")
+    return _json_loads(text[start:end + 1])
+
+# Chat message classes for OpenAI-style role names
+_MESSAGE_TYPES = {"system": SystemMessage, "user": HumanMessage, "assistant": AIMessage}
+
+# Static suggestions used when the model can't be reached
+_EXCLUDE_TXT = (
+    "- User accounts and social login\n"
+    "- Admin dashboard and analytics\n"
+    "- Payments and billing\n"
+    "- Mobile apps and offline support\n"
+    "- Third-party integrations"
+)
+_MVP_TXT = (
+    "- Core workflow that delivers the main value\n"
+    "- Simple data entry and storage\n"
+    "- Basic listing and search\n"
+    "- Minimal settings\n"
+    "- Error handling and feedback"
+)
+_TECH_TXT = (
+    "- Frontend: React\n"
+    "- Backend: Python/FastAPI\n"
+    "- Database: PostgreSQL\n"
+    "- Hosting: a managed platform such as Render or Vercel"
+)
+_GOALS_TXT = (
+    "- Who are the primary users and what problem do they have?\n"
+    "- What does success look like for the first release?\n"
+    "- What constraints (time, budget, skills) apply?"
+)
+_DEFAULT_SUGGESTION = "Could you tell me more about what you want to achieve and who it is for?"
+
+# Fallback routing: first keyword found in the lowercased prompt wins
+_ROUTES = (
+    ("exclude", _EXCLUDE_TXT),
+    ("mvp feature", _MVP_TXT),
+    ("tech", _TECH_TXT),
+    ("goal", _GOALS_TXT),
+)
+
+# Fallback questions for the ConversationAgent perspectives
+_PERSPECTIVE_FALLBACKS = {
+    "product_manager": "What are the most important features your MVP must have to be useful on day one?",
+    "business_analyst": "Who are your target users, and what problem does this solve for them that existing tools don't?",
+    "tech_lead": "Are there technical constraints I should know about, such as hosting, integrations, performance or team skills?",
+    "ux_designer": "Walk me through how a user would accomplish their main task, step by step.",
+    "qa_engineer": "What edge cases or failure scenarios worry you most, and how will you know the MVP works?",
+}
+
+def _fallback_suggestion(prompt: str, context: Dict[str, Any]) -> str:
+    """Static suggestion for a prompt, by perspective or else routed by _ROUTES."""
+    perspective_fallback = _PERSPECTIVE_FALLBACKS.get(context.get("perspective"))
+    if perspective_fallback:
+        return perspective_fallback
+    lower_prompt = prompt.lower()
+    for keyword, suggestion in _ROUTES:
+        if keyword in lower_prompt:
+            return suggestion
+    return _DEFAULT_SUGGESTION
+
+def _format_context(context: Dict[str, Any]) -> str:
+    """Render the non-empty context entries as 'key: value' lines.
+
+    Keys and list items are sorted so the same project always yields the same
+    text, keeping it usable as a provider-side prompt-cache prefix.
+    """
+    return "\n".join(
+        f"{key}: {', '.join(sorted(map(str, value))) if isinstance(value, (list, tuple)) else value}"
+        for key, value in sorted(context.items()) if value
+    )
+
+def _context_messages(prompt: str, context: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Messages with the stable project context first and the prompt last."""
+    return [
+        {"role": "system", "content": f"Project context:\n{_format_context(context)}"},
+        {"role": "user", "content": prompt},
+    ]
+
+# Technology names the generators branch on, matched against words in the tech stack
+_REACT = frozenset({"react", "reactjs"})
+_PY = frozenset({"python", "flask", "fastapi", "django"})
+_NODE = frozenset({"node", "nodejs", "express", "expressjs"})
+_API = frozenset({"api", "backend", "rest", "graphql", "fastapi"})
+# Letter runs, so version numbers drop off ("Python3" -> python, "Node18" -> node)
+_WORD_RE = re.compile(r"[a-z]+")
+
+def _tech_words(tech_stack: Tuple[str, ...]) -> frozenset:
+    """Lowercased words in the tech stack ("Node.js" -> node, js), for set intersections.
+
+    Plurals also contribute their singular ("REST APIs" -> rest, apis, api).
+    """
+    words = set()
+    for tech in tech_stack:
+        for word in _WORD_RE.findall(tech.lower()):
+            words.add(word)
+            if len(word) > 3 and word.endswith("s"):
+                words.add(word[:-1])
+    return frozenset(words)
+
+# Suggested file structures per stack; read-only, callers copy before mutating
+_REACT_FILES = MappingProxyType({
+    "package.json": "Node.js dependencies and scripts",
+    "public/index.html": "HTML entry point",
+    "src/index.js": "Application entry point",
+    "src/App.js": "Root React component",
+    "src/components/": "Reusable UI components",
+    "src/pages/": "Page-level components",
+    "src/services/api.js": "API client",
+    "src/styles/main.css": "Global styles",
+    "README.md": "Project documentation",
+})
+_PYTHON_FILES = MappingProxyType({
+    "requirements.txt": "Python dependencies",
+    "app/__init__.py": "Application package",
+    "app/main.py": "Application entry point",
+    "app/routes.py": "API routes",
+    "app/models.py": "Data models",
+    "app/services.py": "Business logic",
+    "tests/test_main.py": "Unit tests",
+    "README.md": "Project documentation",
+})
+_NODE_FILES = MappingProxyType({
+    "package.json": "Node.js dependencies and scripts",
+    "src/index.js": "Server entry point",
+    "src/routes/index.js": "API routes",
+    "src/controllers/": "Request handlers",
+    "src/models/": "Data models",
+    "tests/": "Unit tests",
+    "README.md": "Project documentation",
+})
+_GENERIC_FILES = MappingProxyType({
+    "src/": "Source code",
+    "tests/": "Tests",
+    "docs/": "Documentation",
+    "README.md": "Project documentation",
+})
+
+@lru_cache(maxsize=64)
+def _file_structure_for(tech_stack: Tuple[str, ...]) -> Mapping[str, str]:
+    """Suggested file structure for a tech stack (cached by stack)."""
+    tech = _tech_words(tech_stack)
+    if tech & _REACT:
+        return _REACT_FILES
+    elif tech & _PY:
+        return _PYTHON_FILES
+    elif tech & _NODE:
+        return _NODE_FILES
+    return _GENERIC_FILES
+
+@lru_cache(maxsize=64)
+def _tasks_for(mvp_features: Tuple[str, ...], file_paths: Tuple[str, ...],
+               tech_stack: Tuple[str, ...]) -> Tuple[Dict[str, Any], ...]:
+    """Suggested development tasks for a project (cached by its inputs)."""
+    tech = _tech_words(tech_stack)
+    tasks = [{"title": "Project setup", "file": "README.md", "estimate": "0.5h", "priority": 1}]
+
+    if tech & _REACT:
+        tasks.append({"title": "Set up React app", "file": "src/App.js", "estimate": "1h", "priority": 1})
+    if tech & _PY:
+        tasks.append({"title": "Set up Python environment", "file": "requirements.txt", "estimate": "0.5h", "priority": 1})
+    if tech & _API:
+        tasks.append({"title": "Create API endpoints", "file": "", "estimate": "2h", "priority": 2})
+
+    # Files a feature task can point at, collected once for all features
+    related_files = [
+        file_path for file_path in file_paths
+        if any(keyword in file_path.lower() for keyword in ("component", "page", "route"))
+    ]
+    for i, feature in enumerate(mvp_features[:5]):
+        tasks.append({
+            "title": f"Implement {feature}",
+            "file": related_files[i] if i < len(related_files) else "",
+            "estimate": "2h",
+            "priority": min(i + 2, 5)
+        })
+
+    tasks.append({"title": "Write tests", "file": "tests/", "estimate": "2h", "priority": 4})
+    tasks.append({"title": "Documentation", "file": "README.md", "estimate": "1h", "priority": 5})
+    return tuple(tasks)
+
+# On-disk cache of model responses, keyed by model, messages, temperature and response format
+_CACHE_PATH = os.path.join(".clarity", "llm_cache.sqlite")
+_CACHE_TTL = 86400  # seconds
+_cache_conn = None
+_cache_lock = threading.Lock()
+
+def _get_cache() -> Optional[sqlite3.Connection]:
+    """Get the response cache, opening it on first use; None when disabled."""
+    global _cache_conn
+    if os.getenv("LLM_CACHE_DISABLE") == "1":
+        return None
+    if _cache_conn is None:
+        # Open under the lock so concurrent first calls share one connection
+        with _cache_lock:
+            if _cache_conn is None:
+                os.makedirs(".clarity", exist_ok=True)
+                conn = sqlite3.connect(_CACHE_PATH, check_same_thread=False)
+                try:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT, created REAL)"
+                    )
+                except sqlite3.Error:
+                    conn.close()
+                    raise
+                _cache_conn = conn
+    return _cache_conn
+
+def _cache_key(
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: Optional[float],
+    response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    """Stable digest identifying one model request; message text is matched exactly."""
+    contents = [(m["role"], m["content"]) for m in messages]
+    return hashlib.blake2b(
+        _json_dumps([model, contents, temperature, response_format]), digest_size=16
+    ).hexdigest()
+
+def _cache_get(key: str) -> Optional[str]:
+    """Look up a fresh cached response."""
+    try:
+        cache = _get_cache()
+        if cache is None:
+            return None
+        with _cache_lock:
+            row = cache.execute(
+                "SELECT response FROM responses WHERE key = ? AND created > ?",
+                (key, time.time() - _CACHE_TTL)
+            ).fetchone()
+        return row[0] if row else None
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error reading LLM cache: {e}")
+        return None
+
+def _cache_set(key: str, response: str) -> None:
+    """Store a response in the cache."""
+    try:
+        cache = _get_cache()
+        if cache is None:
+            return
+        with _cache_lock, cache:
+            cache.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created) VALUES (?, ?, ?)",
+                (key, response, time.time())
+            )
+    except (sqlite3.Error, OSError) as e:
+        print(f"Error writing LLM cache: {e}")
+
+# Responses already fetched during the current agent turn (see LLMHelper.request_scope)
+_request_cache: ContextVar[Optional[Dict[str, str]]] = ContextVar("llm_request_cache", default=None)
+
+# Chat clients shared by all helpers, one per model, so HTTP connections are reused
+_chat_models: Dict[str, ChatOpenAI] = {}
+
+def _get_chat_model(model_name: str) -> ChatOpenAI:
+    """Get the shared chat client for a model, creating it on first use."""
+    if model_name not in _chat_models:
+        _chat_models[model_name] = ChatOpenAI(
+            base_url=_OPENROUTER_BASE_URL,
             model=model_name,
-            api_key=os.getenv("OPENAI_API_KEY"),
+            api_key=_API_KEY,
             temperature=0.7,
+            request_timeout=60,
+            max_retries=3,
+            # Report token usage in the final chunk of streamed replies
+            stream_usage=True,
         )
+    return _chat_models[model_name]
+
+class LLMHelper:
+    """A streamlined helper class for interacting with language models."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        """Initializes the LLM helper with a specified model."""
+        self.llm = _get_chat_model(model_name)
+        # Model to use for each kind of call
+        self.models = {
+            "suggestions": model_name,
+            "structured": _STRUCTURED_MODEL or model_name,
+        }
 
     def generate(self, prompt: str) -> str:
         """
@@ -29,9 +358,81 @@ class LLMHelper:
         Returns:
             The language model's response.
         """
-        messages = [HumanMessage(content=prompt)]
-        response = self.llm.invoke(messages)
-        return response.content
+        return self._invoke([{"role": "user", "content": prompt}])
+
+    def _invoke(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        model: Optional[str] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Send role/content messages to the model, answering repeats from the cache."""
+        llm = self._chat_model(model, temperature, response_format)
+        key = _cache_key(
+            model or self.llm.model_name,
+            messages,
+            self.llm.temperature if temperature is None else temperature,
+            response_format
+        )
+        scope = _request_cache.get()
+        if scope is not None and key in scope:
+            return scope[key]
+
+        response = _cache_get(key)
+        if response is None:
+            chat_messages = [_MESSAGE_TYPES.get(m["role"], HumanMessage)(content=m["content"]) for m in messages]
+            response = llm.invoke(chat_messages).content
+            _cache_set(key, response)
+        if scope is not None:
+            scope[key] = response
+        return response
+
+    @contextmanager
+    def request_scope(self):
+        """Memoize responses for the duration of one agent turn.
+
+        Identical requests made inside the block are sent (or read from the
+        disk cache) once; the memo is dropped when the block exits.
+        """
+        token = _request_cache.set({})
+        try:
+            yield
+        finally:
+            _request_cache.reset(token)
+
+    def _chat_model(
+        self,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ):
+        """The chat client for a model (default: this helper's), with optional request overrides."""
+        llm = _get_chat_model(model) if model else self.llm
+        overrides = {}
+        if temperature is not None:
+            overrides["temperature"] = temperature
+        if response_format is not None:
+            overrides["response_format"] = response_format
+        return llm.bind(**overrides) if overrides else llm
+
+    def generate_many(self, prompts: List[str], max_concurrency: int = 5) -> List[Optional[str]]:
+        """
+        Generates responses for independent prompts concurrently.
+
+        Args:
+            prompts: The prompts to send.
+            max_concurrency: The most requests in flight at once.
+
+        Returns:
+            One response per prompt, or None where that call failed.
+        """
+        responses = self.llm.batch(
+            [[HumanMessage(content=prompt)] for prompt in prompts],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True
+        )
+        return [None if isinstance(response, Exception) else response.content for response in responses]
 
     def generate_with_history(
         self, prompt: str, history: List[Dict[str, Any]]
@@ -54,4 +455,121 @@ class LLMHelper:
                 messages.append(AIMessage(content=message.content))
         
         response = self.llm.invoke(messages)
-        return response.content
\ No newline at end of file
+        return response.content
+
+    def _call_openrouter(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        stream: bool = False,
+        model: Optional[str] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> Union[str, Iterator[str], None]:
+        """
+        Sends role/content messages to the model.
+
+        Pass response_format=JSON_OBJECT_FORMAT to ask providers that support it
+        for a bare JSON object; extract_json still copes with ones that don't.
+
+        Returns:
+            The response text, a generator of text chunks if streaming,
+            or None if the call failed.
+        """
+        if stream:
+            chat_messages = [_MESSAGE_TYPES.get(m["role"], HumanMessage)(content=m["content"]) for m in messages]
+            return self._stream_chunks(self._chat_model(model, temperature, response_format), chat_messages)
+        try:
+            return self._invoke(messages, temperature, model, response_format)
+        except Exception as e:
+            print(f"Error calling OpenRouter: {e}")
+            return None
+
+    @staticmethod
+    def _stream_chunks(llm, chat_messages) -> Iterator[str]:
+        """Yield response text chunks as they arrive."""
+        try:
+            for chunk in llm.stream(chat_messages):
+                yield chunk.content
+        except Exception as e:
+            print(f"Error streaming from OpenRouter: {e}")
+
+    def generate_suggestions(
+        self, prompt: str, context: Dict[str, Any], stream: bool = False
+    ) -> Union[str, Iterator[str]]:
+        """
+        Generate a suggestion for a prompt, falling back to static text.
+
+        With stream=True a generator of text chunks is returned so the UI can
+        show the reply as it arrives.
+        """
+        messages = _context_messages(prompt, context)
+        if stream:
+            return self._stream_suggestions(messages, prompt, context)
+        try:
+            return self._invoke(messages)
+        except Exception as e:
+            print(f"Error generating suggestions: {e}")
+        return _fallback_suggestion(prompt, context)
+
+    def generate_suggestions_multi(self, prompts: Dict[str, str], context: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Generate suggestions for several perspectives in a single model call.
+
+        Args:
+            prompts: The prompt for each perspective, keyed by perspective name.
+            context: Project context shared by all of the prompts.
+
+        Returns:
+            A suggestion for every perspective in prompts.
+        """
+        context_text = _format_context(context)
+        role_lines = "\n".join(f"- {perspective}: {prompt}" for perspective, prompt in prompts.items())
+        batch_prompt = (
+            f"Project context:\n{context_text}\n\n"
+            f"Output a JSON object with the keys {', '.join(prompts)}. "
+            f"For each key, answer as that role:\n{role_lines}"
+        )
+        try:
+            response = self.generate(batch_prompt)
+        except Exception as e:
+            print(f"Error generating suggestions: {e}")
+            return {perspective: _fallback_suggestion(prompt, {"perspective": perspective})
+                    for perspective, prompt in prompts.items()}
+
+        try:
+            suggestions = extract_json(response)
+            if isinstance(suggestions, dict) and all(isinstance(suggestions.get(p), str) for p in prompts):
+                return {perspective: suggestions[perspective] for perspective in prompts}
+        except ValueError as e:
+            print(f"Error parsing batched suggestions: {e}")
+
+        # The reply wasn't usable; ask each perspective separately, concurrently
+        responses = self.generate_many([f"Project context:\n{context_text}\n\n{prompt}" for prompt in prompts.values()])
+        return {
+            perspective: response or _fallback_suggestion(prompt, {"perspective": perspective})
+            for (perspective, prompt), response in zip(prompts.items(), responses)
+        }
+
+    def _stream_suggestions(
+        self, messages: List[Dict[str, str]], prompt: str, context: Dict[str, Any]
+    ) -> Iterator[str]:
+        """Stream a suggestion, yielding the static fallback if nothing arrives."""
+        received = False
+        for chunk in self._call_openrouter(messages, stream=True):
+            received = True
+            yield chunk
+        if not received:
+            yield _fallback_suggestion(prompt, context)
+
+    def generate_file_structure(self, project_data: Dict[str, Any]) -> Dict[str, str]:
+        """Suggest a file structure for the project's tech stack."""
+        return dict(_file_structure_for(tuple(project_data.get("tech_stack") or ())))
+
+    def generate_tasks(self, project_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Suggest development tasks for the project's MVP features."""
+        tasks = _tasks_for(
+            tuple(project_data.get("mvp_features") or ()),
+            tuple(project_data.get("file_map") or ()),
+            tuple(project_data.get("tech_stack") or ())
+        )
+        return [dict(task) for task in tasks]
@@ -3,11 +3,17 @@ Simple web search integration using Crawl4AI.
 Extends existing LLMHelper functionality without duplication.
 """
 import asyncio
+import atexit
 import os
-from typing import List, Dict, Optional, Any
-from urllib.parse import quote_plus
+import re
+import threading
 import time
-import random
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Optional, Any, Mapping, Tuple
+from urllib.parse import quote_plus, urlparse
 
 try:
     from crawl4ai import WebCrawler
@@ -15,6 +21,102 @@ try:
 except ImportError:
     CRAWL4AI_AVAILABLE = False
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Markup removed from fetched HTML before it is used as a snippet
+_SCRIPT_RE = re.compile(r"<(script|style)\b.*?</\1>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+# First markdown "# " heading, <h1> or <title> line
+_TITLE_RE = re.compile(r"^[ \t]*(?:#[ \t]+|<h1>[ \t]*|<title>[ \t]*)(.+?)[ \t]*(?:</h1>|</title>|$)", re.MULTILINE | re.IGNORECASE)
+_HTML_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+# Friendly names for result sources, by domain
+_SOURCE_NAMES = {
+    "stackoverflow.com": "Stack Overflow",
+    "github.com": "GitHub",
+    "reddit.com": "Reddit",
+    "dev.to": "DEV Community",
+}
+
+# Search pages crawled for a query, in order of preference; {} is the URL-encoded query
+_SEARCH_URL_TEMPLATES = (
+    "https://stackoverflow.com/search?q={}",
+    "https://www.reddit.com/search/?q={}",
+    "https://github.com/search?q={}",
+    "https://dev.to/search?q={}",
+)
+
+# Simulated search results as (url, title, snippet, source) format strings
+_SIM_TEMPLATES = (
+    (
+        "https://example.com/guide/{slug}",
+        "Comprehensive Guide: {title}",
+        "A complete guide to {query} with practical examples and modern approaches. Learn about best practices, implementation details, and common pitfalls to avoid when working with {query}.",
+        "SimulatedWeb",
+    ),
+    (
+        "https://stackoverflow.com/questions/{question_id}/{slug}",
+        "How to implement {query} correctly?",
+        "Q: I'm trying to work with {query} but facing some challenges. What's the most efficient way to approach this? A: There are several methods to handle {query}. The most widely accepted approach is to...",
+        "StackOverflow (Simulated)",
+    ),
+    (
+        "https://github.com/topics/{slug}",
+        "GitHub Repositories for {title}",
+        "Find the most popular open-source projects related to {query}. These repositories showcase various implementation patterns and solutions for common problems in the {query} domain.",
+        "GitHub (Simulated)",
+    ),
+    (
+        "https://dev.to/t/{tag}",
+        "Latest Articles on {title} - DEV Community",
+        "Recent discussions and tutorials about {query} from the developer community. Learn from real-world experiences and best practices shared by experts.",
+        "DEV.to (Simulated)",
+    ),
+)
+
+@lru_cache(maxsize=128)
+def _simulated_results(query: str, max_results: int) -> Tuple[Mapping[str, str], ...]:
+    """Simulated results for a query (cached; read-only, callers copy before mutating)."""
+    if max_results <= 0:
+        return ()
+        
+    # Fill in only the templates that will be returned
+    fields = {
+        "query": query,
+        "title": query.title(),
+        "slug": query.replace(' ', '-').lower(),
+        "tag": query.replace(' ', '').lower(),
+        # Stable per query, so repeated fallbacks can share one cached entry
+        "question_id": zlib.crc32(query.encode()) % 90000000 + 10000000,
+    }
+    return tuple(
+        MappingProxyType({
+            "url": url.format(**fields),
+            "title": title.format(**fields),
+            "snippet": snippet.format(**fields),
+            "source": source
+        })
+        for url, title, snippet, source in _SIM_TEMPLATES[:max_results]
+    )
+
+# Minimum gap between requests to the same host
+_HOST_INTERVAL = 0.5  # seconds
+
+# Search result cache bounds
+_CACHE_MAX_ENTRIES = 256
+_CACHE_TTL = 3600  # seconds
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+    loop.close()
+
 
 class WebSearchHelper:
     """Enhanced web search helper that integrates with existing components and provides fallbacks."""
@@ -27,9 +129,25 @@ class WebSearchHelper:
                 self.crawler = WebCrawler(verbose=False)
             except Exception as e:
                 print(f"Crawl4AI initialization failed: {e}")
+        
+        # One long-lived event loop for all crawls, so connection state survives between searches;
+        # it runs on its own thread so searches from several callers overlap
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=_run_loop, args=(self._loop,), daemon=True)
+        self._loop_thread.start()
+        # Most crawls in flight at once
+        self._crawl_semaphore = asyncio.BoundedSemaphore(4)
+        # Requests to one host start at least _HOST_INTERVAL apart: host -> next free start time
+        self._host_ready: Dict[str, float] = {}
+        # Shared HTTP session for plain page fetches, opened on the loop at first use
+        self._session = None
+        atexit.register(self.close)
                 
-        # Cache for search results to avoid repeating identical searches
-        self.search_cache = {}
+        # Cache for search results to avoid repeating identical searches:
+        # key -> (stored at, results), least recently used first
+        self.search_cache = OrderedDict()
+        # The helper may be shared by several sessions and search threads
+        self._cache_lock = threading.Lock()
     
     def search_for_context(self, query: str, max_results: int = 3) -> List[Dict[str, str]]:
         """
@@ -45,137 +163,147 @@ class WebSearchHelper:
         """
         # Check cache first to avoid repeated searches
         cache_key = f"{query}_{max_results}"
-        if cache_key in self.search_cache:
-            return self.search_cache[cache_key]
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
             
-        # If Crawl4AI isn't available, use simulated search
-        if not self.crawler:
+        # Try a live search when pages can be fetched
+        results = []
+        if AIOHTTP_AVAILABLE or self.crawler:
+            try:
+                results = self._search_web(query, quote_plus(query), max_results)
+            except Exception as e:
+                print(f"Web search error: {e}")
+        
+        # Otherwise fall back to simulated results
+        if not results:
             results = self._get_simulated_results(query, max_results)
-            self.search_cache[cache_key] = results
-            return results
+        self._cache_set(cache_key, results)
+        return results
+    
+    def _search_web(self, query: str, encoded_query: str, max_results: int) -> List[Dict[str, str]]:
+        """Crawl the search pages of a few developer sites for a URL-encoded query."""
+        # Only build the URLs that will be crawled
+        search_urls = [template.format(encoded_query) for template in _SEARCH_URL_TEMPLATES[:max_results]]
         
-        # Try Crawl4AI search with optimized URLs
+        # Crawl all search pages concurrently on the helper's event loop
+        crawled = asyncio.run_coroutine_threadsafe(self._crawl_all(search_urls, query), self._loop).result()
+        return [result for result in crawled if result]
+    
+    def _cache_get(self, key: str) -> Optional[List[Dict[str, str]]]:
+        """Look up fresh cached results, marking them recently used."""
+        with self._cache_lock:
+            entry = self.search_cache.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= _CACHE_TTL:
+                del self.search_cache[key]
+                return None
+            self.search_cache.move_to_end(key)
+            return entry[1]
+    
+    def _cache_set(self, key: str, results: List[Dict[str, str]]) -> None:
+        """Cache results, evicting the least recently used entry when full."""
+        with self._cache_lock:
+            self.search_cache[key] = (time.time(), results)
+            self.search_cache.move_to_end(key)
+            if len(self.search_cache) > _CACHE_MAX_ENTRIES:
+                self.search_cache.popitem(last=False)
+    
+    def close(self) -> None:
+        """Close the HTTP session and stop the crawl event loop."""
+        if not self._loop_thread.is_alive():
+            return
+        if self._session is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result(timeout=5)
+            except Exception as e:
+                print(f"Error closing search session: {e}")
+            self._session = None
+        # The loop closes itself on its thread once stopped
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=5)
+    
+    async def _crawl_all(self, urls: List[str], query: str) -> List[Optional[Dict[str, str]]]:
+        """Crawl several URLs concurrently; failed pages come back as None."""
+        return await asyncio.gather(*(self._crawl_one(url, query) for url in urls))
+    
+    async def _crawl_one(self, url: str, query: str) -> Optional[Dict[str, str]]:
+        """Crawl one search page into a result dictionary, or None if it fails.
+
+        Pages are fetched over plain HTTP when aiohttp is installed; Crawl4AI's
+        browser rendering is only used without it.
+        """
         try:
-            # Encode query for URL safety
-            encoded_query = quote_plus(query)
-            
-            # Use more varied and useful search URLs
-            search_urls = [
-                f"https://stackoverflow.com/search?q={encoded_query}",
-                f"https://www.reddit.com/search/?q={encoded_query}",
-                f"https://github.com/search?q={encoded_query}",
-                f"https://dev.to/search?q={encoded_query}"
-            ]
-            
-            results = []
-            for url in search_urls[:max_results]:
-                try:
-                    # Add a small delay to prevent rate limiting
-                    time.sleep(random.uniform(0.5, 1.5))
-                    
-                    # Use synchronous run for simplicity
-                    result = asyncio.run(self.crawler.arun(url=url))
-                    if result.success and result.markdown:
-                        source_name = self._get_source_name(url)
-                        title = self._extract_title(result.markdown) or f"Search: {query}"
-                        
-                        results.append({
-                            "url": url,
-                            "title": title,
-                            "snippet": result.markdown[:300] + "...",
-                            "source": source_name
-                        })
-                except Exception as e:
-                    print(f"Error crawling {url}: {e}")
-                    continue
-            
-            # If we found results, cache and return them
-            if results:
-                self.search_cache[cache_key] = results
-                return results
-                
-            # Otherwise fall back to simulated results
-            results = self._get_simulated_results(query, max_results)
-            self.search_cache[cache_key] = results
-            return results
-            
+            await self._host_turn(url)
+            async with self._crawl_semaphore:
+                if AIOHTTP_AVAILABLE:
+                    html = await self._fetch(url)
+                    match = _HTML_TITLE_RE.search(html)
+                    title = _SPACE_RE.sub(" ", match.group(1)).strip()[:100] if match else None
+                    text = _SPACE_RE.sub(" ", _TAG_RE.sub(" ", _SCRIPT_RE.sub(" ", html))).strip()
+                else:
+                    result = await self.crawler.arun(url=url)
+                    if not result.success:
+                        return None
+                    text = result.markdown
+                    title = self._extract_title(text)
+            if text:
+                return {
+                    "url": url,
+                    "title": title or f"Search: {query}",
+                    "snippet": text[:300] + "...",
+                    "source": self._get_source_name(url)
+                }
         except Exception as e:
-            print(f"Web search error: {e}")
-            results = self._get_simulated_results(query, max_results)
-            self.search_cache[cache_key] = results
-            return results
+            print(f"Error crawling {url}: {e}")
+        return None
+    
+    async def _host_turn(self, url: str) -> None:
+        """Wait for the next request slot on this URL's host.
+
+        Slots are reserved up front, so a slow fetch from one search doesn't hold
+        up other searches to the same host; distinct hosts don't wait on each other.
+        """
+        host = urlparse(url).hostname or ""
+        now = time.monotonic()
+        start = max(now, self._host_ready.get(host, 0))
+        self._host_ready[host] = start + _HOST_INTERVAL
+        if start > now:
+            await asyncio.sleep(start - now)
+    
+    async def _fetch(self, url: str) -> str:
+        """Fetch a page's HTML through the shared session."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=5),
+            )
+        async with self._session.get(url) as response:
+            response.raise_for_status()
+            return await response.text()
     
     def _get_simulated_results(self, query: str, max_results: int) -> List[Dict[str, str]]:
         """Generate enhanced simulated search results when real search fails.
         Creates more realistic and varied simulated results.
         """
-        if max_results <= 0:
-            return []
-            
-        # Generate varied and realistic-looking search results
-        simulated_results = [
-            {
-                "url": f"https://example.com/guide/{query.replace(' ', '-').lower()}",
-                "title": f"Comprehensive Guide: {query.title()}",
-                "snippet": f"A complete guide to {query} with practical examples and modern approaches. Learn about best practices, implementation details, and common pitfalls to avoid when working with {query}.",
-                "source": "SimulatedWeb"
-            },
-            {
-                "url": f"https://stackoverflow.com/questions/{random.randint(10000000, 99999999)}/{query.replace(' ', '-').lower()}",
-                "title": f"How to implement {query} correctly?",
-                "snippet": f"Q: I'm trying to work with {query} but facing some challenges. What's the most efficient way to approach this? A: There are several methods to handle {query}. The most widely accepted approach is to...",
-                "source": "StackOverflow (Simulated)"
-            },
-            {
-                "url": f"https://github.com/topics/{query.replace(' ', '-').lower()}",
-                "title": f"GitHub Repositories for {query.title()}",
-                "snippet": f"Find the most popular open-source projects related to {query}. These repositories showcase various implementation patterns and solutions for common problems in the {query} domain.",
-                "source": "GitHub (Simulated)"
-            },
-            {
-                "url": f"https://dev.to/t/{query.replace(' ', '').lower()}",
-                "title": f"Latest Articles on {query.title()} - DEV Community",
-                "snippet": f"Recent discussions and tutorials about {query} from the developer community. Learn from real-world experiences and best practices shared by experts.",
-                "source": "DEV.to (Simulated)"
-            }
-        ]
-        
-        # Return only the requested number of results
-        return simulated_results[:max_results]
+        return [dict(result) for result in _simulated_results(query, max_results)]
     
     def _get_source_name(self, url: str) -> str:
         """Extract a friendly source name from a URL."""
-        if "stackoverflow.com" in url:
-            return "Stack Overflow"
-        elif "github.com" in url:
-            return "GitHub"
-        elif "reddit.com" in url:
-            return "Reddit"
-        elif "dev.to" in url:
-            return "DEV Community"
-        else:
-            return "Web"
+        host = urlparse(url).hostname or ""
+        # Match the registered domain, so subdomains count but look-alike hosts don't
+        return _SOURCE_NAMES.get(".".join(host.rsplit(".", 2)[-2:]), "Web")
     
     def _extract_title(self, content: str) -> Optional[str]:
         """Try to extract a title from the content."""
         if not content:
             return None
             
-        # Look for heading patterns
-        lines = content.split('\n')
-        for line in lines[:10]:  # Check first 10 lines
-            line = line.strip()
-            # Check for markdown headings or HTML title patterns
-            if line.startswith('# ') or line.startswith('<h1>') or line.startswith('<title>'):
-                # Clean up the line
-                title = line.replace('#', '').replace('<h1>', '').replace('</h1>', '')
-                title = title.replace('<title>', '').replace('</title>', '').strip()
-                if title:
-                    return title[:100]  # Limit length
+        # Markdown heading or HTML title near the top of the page
+        match = _TITLE_RE.search(content, 0, 2048)
+        if match:
+            return match.group(1)[:100]  # Limit length
                     
         # If no heading found, use the first non-empty line
-        for line in lines:
-            if line.strip():
-                return line.strip()[:100]  # Limit length
-                
-        return None
+        return next((line.strip()[:100] for line in content.splitlines() if line.strip()), None)
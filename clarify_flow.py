@@ -1,9 +1,36 @@
 #!/usr/bin/env python3
 import os
+import sys
 import json
 import argparse
+from itertools import takewhile
 from clarification_agent.core.agent_manager import ClarificationAgentManager
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _read_json(path):
+    """Parse a JSON file, using orjson when it is installed."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def _read_paragraph():
+    """Read lines of input up to the first empty line."""
+    if not sys.stdin.isatty():
+        # Piped input: take lines straight from the buffered stream (also stops at end of input)
+        return "\n".join(takewhile(bool, (line.rstrip("\n") for line in sys.stdin)))
+    lines = []
+    while True:
+        line = input()
+        if line == "":
+            break
+        lines.append(line)
+    return "\n".join(lines)
+
 def main():
     """Main entry point for the Clarification Agent CLI"""
     parser = argparse.ArgumentParser(description="Clarification Agent - Project planning tool")
@@ -15,15 +42,11 @@ def main():
     project_name = args.project
     project_data = None
     
-    # Check if project exists
-    if args.update or os.path.exists(os.path.join(".clarity", f"{project_name}.json")):
-        try:
-            with open(os.path.join(".clarity", f"{project_name}.json"), "r") as f:
-                project_data = json.load(f)
-            print(f"Loaded existing project: {project_name}")
-        except (FileNotFoundError, json.JSONDecodeError):
-            print(f"Creating new project: {project_name}")
-    else:
+    # Load the project if it exists
+    try:
+        project_data = _read_json(os.path.join(".clarity", f"{project_name}.json"))
+        print(f"Loaded existing project: {project_name}")
+    except (FileNotFoundError, json.JSONDecodeError):
         print(f"Creating new project: {project_name}")
     
     # Initialize agent manager
@@ -91,25 +114,13 @@ def main():
                         change = input("Change? (y/n): ")
                         if change.lower() == "y":
                             print("Enter new value (empty line to finish):")
-                            lines = []
-                            while True:
-                                line = input()
-                                if line == "":
-                                    break
-                                lines.append(line)
-                            responses[question["id"]] = "\n".join(lines)
+                            responses[question["id"]] = _read_paragraph()
                         else:
                             responses[question["id"]] = question["value"]
                     else:
                         print(f"\n{prompt}")
                         print("Enter value (empty line to finish):")
-                        lines = []
-                        while True:
-                            line = input()
-                            if line == "":
-                                break
-                            lines.append(line)
-                        responses[question["id"]] = "\n".join(lines)
+                        responses[question["id"]] = _read_paragraph()
         
         # Process responses and get next node
         next_node = agent_manager.submit_responses(current_node, responses)
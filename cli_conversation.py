@@ -8,9 +8,15 @@ import sys
 import json
 from clarification_agent.core.conversation_agent import ConversationAgent
 
+# Windows consoles only honour ANSI escape codes once VT processing is on;
+# an empty system() call switches it on for this process
+if os.name == 'nt':
+    os.system('')
+
 def clear_screen():
     """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    sys.stdout.write("\x1b[2J\x1b[H")
+    sys.stdout.flush()
 
 def print_header():
     """Print the header"""
@@ -8,9 +8,27 @@ import sys
 import json
 from clarification_agent.core.conversation_agent import ConversationAgent
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _read_json(path):
+    """Parse a JSON file, using orjson when it is installed."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+# Windows consoles only honour ANSI escape codes once VT processing is on;
+# an empty system() call switches it on for this process
+if os.name == 'nt':
+    os.system('')
+
 def clear_screen():
     """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    sys.stdout.write("\x1b[2J\x1b[H")
+    sys.stdout.flush()
 
 def print_header():
     """Print the header"""
@@ -24,11 +42,10 @@ def print_header():
 
 def load_project_data(project_name):
     """Load project data from .clarity folder if it exists"""
-    clarity_path = os.path.join(".clarity", f"{project_name}.json")
-    if os.path.exists(clarity_path):
-        with open(clarity_path, "r") as f:
-            return json.load(f)
-    return None
+    try:
+        return _read_json(os.path.join(".clarity", f"{project_name}.json"))
+    except FileNotFoundError:
+        return None
 
 def main():
     """Main CLI function"""
@@ -42,12 +59,20 @@ def main():
         return
     
     # Check if project exists
-    project_data = None
-    if os.path.exists(os.path.join(".clarity", f"{project_name}.json")):
+    try:
+        project_data = load_project_data(project_name)
+    except ValueError as e:
+        # The file is there but isn't valid JSON, so it can only be overwritten
+        print(f"Project '{project_name}' exists but could not be read: {e}")
+        project_data = None
+        overwrite = input("Overwrite existing project? (y/n): ")
+        if overwrite.lower() != 'y':
+            print("Exiting...")
+            return
+    if project_data is not None:
         load_existing = input(f"Project '{project_name}' already exists. Load it? (y/n): ")
-        if load_existing.lower() == 'y':
-            project_data = load_project_data(project_name)
-        else:
+        if load_existing.lower() != 'y':
+            project_data = None
             overwrite = input("Overwrite existing project? (y/n): ")
             if overwrite.lower() != 'y':
                 print("Exiting...")
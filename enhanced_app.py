@@ -4,6 +4,9 @@ Modular architecture that extends existing functionality without code duplicatio
 """
 import streamlit as st
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from clarification_agent.core.conversation_agent import ConversationAgent
 from clarification_agent.core.clarity_validator import ClarityValidator
 from clarification_agent.config.node_config import get_node_config_manager
@@ -12,6 +15,23 @@ from clarification_agent.ui.process_tracker import ProcessTracker
 from clarification_agent.ui.visualizations import render_enhanced_workflow_sidebar, render_enhanced_process_details, render_project_completion_summary
 from clarification_agent.utils.web_search import WebSearchHelper
 
+# Background threads for web searches, so responses don't wait on the crawl
+_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+# Chat messages kept per session, and how many are shown unless full history is requested
+_MAX_MESSAGES = 200
+_RECENT_MESSAGES = 50
+
+
+@st.cache_resource
+def get_web_search_helper() -> WebSearchHelper:
+    """Get the web search helper shared by all sessions (one crawler and result cache per process).
+
+    Its crawls run on the helper's own event loop thread, so searches from
+    different sessions overlap instead of queueing behind each other.
+    """
+    return WebSearchHelper()
+
 
 def initialize_enhanced_session_state():
     """Initialize session state with enhanced features."""
@@ -19,20 +39,23 @@ def initialize_enhanced_session_state():
     workflow_config = config_manager.get_workflow_config()
     
     if "messages" not in st.session_state:
-        st.session_state.messages = []
+        st.session_state.messages = deque(maxlen=_MAX_MESSAGES)
     
     if "agent" not in st.session_state:
         st.session_state.agent = None
         st.session_state.project_name = None
         st.session_state.complete = False
         st.session_state.current_node = workflow_config.get("start_node", "start")
-        st.session_state.completed_nodes = set()
+        st.session_state.completed_mask = 0
         st.session_state.current_node_started = False
     
     ProcessTracker.initialize()
     
     if "web_search" not in st.session_state:
-        st.session_state.web_search = WebSearchHelper()
+        st.session_state.web_search = get_web_search_helper()
+    
+    if "pending_searches" not in st.session_state:
+        st.session_state.pending_searches = []
     
     if "clarity_validator" not in st.session_state:
         st.session_state.clarity_validator = ClarityValidator()
@@ -42,8 +65,12 @@ def initialize_enhanced_session_state():
 
 
 def get_current_node_config():
-    """Get current node configuration."""
-    return st.session_state.config_manager.get_node_config(st.session_state.current_node)
+    """Get current node configuration, cached in session state per node."""
+    node_id = st.session_state.current_node
+    cache = st.session_state.setdefault("node_config_cache", {})
+    if node_id not in cache:
+        cache[node_id] = st.session_state.config_manager.get_node_config(node_id)
+    return cache[node_id]
 
 
 def process_user_input_enhanced(user_input: str):
@@ -72,7 +99,7 @@ def process_user_input_enhanced(user_input: str):
         
         # Log interaction
         ProcessTracker.log_llm_call(
-            prompt=f"Node: {current_node_config['label']}, Input: {user_input}",
+            prompt=(current_node_config['label'], user_input),
             response=agent_response
         )
         
@@ -83,10 +110,10 @@ def process_user_input_enhanced(user_input: str):
                 project_name=st.session_state.project_name,
                 node_label=current_node_config['label'].lower()
             )
-            search_results = st.session_state.web_search.search_for_context(search_query, 1)
-            
-            for result in search_results:
-                ProcessTracker.add_citation(result["url"], result["title"], result["snippet"])
+            # Runs in the background; citations are attached once it finishes
+            st.session_state.pending_searches.append(
+                _SEARCH_EXECUTOR.submit(st.session_state.web_search.search_for_context, search_query, 1)
+            )
         
         typing_placeholder.empty()
         
@@ -101,6 +128,61 @@ def process_user_input_enhanced(user_input: str):
         return "I encountered an error. Please try again.", False
 
 
+def collect_finished_searches():
+    """Add citations from background web searches that have finished."""
+    pending = []
+    for future in st.session_state.pending_searches:
+        if not future.done():
+            pending.append(future)
+            continue
+        try:
+            for result in future.result():
+                ProcessTracker.add_citation(result["url"], result["title"], result["snippet"])
+        except Exception as e:
+            print(f"Error in web search: {e}")
+    st.session_state.pending_searches = pending
+
+
+def complete_current_node():
+    """Mark the current node complete and move to the next one; returns it, or None when the workflow is done."""
+    node_index = st.session_state.config_manager.get_node_index()
+    st.session_state.completed_mask |= 1 << node_index[st.session_state.current_node]
+    
+    # Get next node from configuration
+    next_node_id = st.session_state.config_manager.get_next_node(st.session_state.current_node)
+    
+    if next_node_id and next_node_id != "complete":
+        st.session_state.current_node = next_node_id
+        st.session_state.current_node_started = False
+        return next_node_id
+    
+    st.session_state.complete = True
+    return None
+
+
+def apply_node_action():
+    """Apply the action chosen in the node controls form (runs before the rerun)."""
+    action = st.session_state.node_action
+    
+    if action == "Complete Current Section":
+        next_node_id = complete_current_node()
+        if next_node_id:
+            next_node_config = st.session_state.config_manager.get_node_config(next_node_id)
+            st.toast(f"Moving to {next_node_config['label']}!")
+    
+    elif action == "Retry":
+        if st.session_state.messages:
+            st.session_state.messages.pop()
+        st.toast("You can provide a new response for this section.")
+    
+    elif action == "Skip":
+        next_node_id = st.session_state.config_manager.get_next_node(st.session_state.current_node)
+        if next_node_id and next_node_id != "complete":
+            st.session_state.current_node = next_node_id
+            st.session_state.current_node_started = False
+            st.toast("Skipped to next section.")
+
+
 def main():
     """Enhanced main function with modular components."""
     st.set_page_config(
@@ -115,6 +197,7 @@ def main():
     st.write("Project clarification with robust node configuration and enhanced visualizations.")
     
     initialize_enhanced_session_state()
+    collect_finished_searches()
     
     # Sidebar
     with st.sidebar:
@@ -133,19 +216,16 @@ def main():
                     st.session_state.enable_web_search = enable_web_search
                     
                     # Reset state
-                    st.session_state.messages = []
+                    st.session_state.messages = deque(maxlen=_MAX_MESSAGES)
                     st.session_state.complete = False
                     st.session_state.current_node = st.session_state.config_manager.get_workflow_config().get("start_node", "start")
-                    st.session_state.completed_nodes = set()
+                    st.session_state.completed_mask = 0
                     st.session_state.current_node_started = False
+                    st.session_state.node_config_cache = {}
+                    st.session_state.pending_searches = []
                     
                     # Clear process tracker
-                    st.session_state.process_tracker = {
-                        "llm_calls": [],
-                        "citations": [],
-                        "clarity_scores": {},
-                        "current_step": None
-                    }
+                    ProcessTracker.reset()
                     
                     st.rerun()
         
@@ -154,7 +234,7 @@ def main():
             st.sidebar.markdown("---")
             render_enhanced_workflow_sidebar(
                 st.session_state.current_node,
-                st.session_state.completed_nodes,
+                st.session_state.completed_mask,
                 st.session_state.process_tracker
             )
     
@@ -165,8 +245,12 @@ def main():
         if st.session_state.complete:
             st.sidebar.success("Project planning complete!")
     
-    # Enhanced chat messages
-    for message in st.session_state.messages:
+    # Enhanced chat messages: only the most recent unless full history is requested
+    messages = st.session_state.messages
+    hidden = max(len(messages) - _RECENT_MESSAGES, 0)
+    if hidden and st.sidebar.checkbox("Show full history", value=False):
+        hidden = 0
+    for message in islice(messages, hidden, None):
         with st.chat_message(message["role"]):
             content = create_animated_container(message["content"])
             st.markdown(content, unsafe_allow_html=True)
@@ -205,44 +289,28 @@ def main():
                 
                 # Add assistant response
                 st.session_state.messages.append({"role": "assistant", "content": agent_response})
-                
-                # Enhanced completion logic with node controls
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    if is_complete or st.button("Complete Current Section"):
-                        st.session_state.completed_nodes.add(st.session_state.current_node)
-                        
-                        # Get next node from configuration
-                        next_node_id = st.session_state.config_manager.get_next_node(st.session_state.current_node)
-                        
-                        if next_node_id and next_node_id != "complete":
-                            next_node_config = st.session_state.config_manager.get_node_config(next_node_id)
-                            st.session_state.current_node = next_node_id
-                            st.session_state.current_node_started = False
-                            st.success(f"Moving to {next_node_config['label']}!")
-                            time.sleep(1)
-                        else:
-                            st.session_state.complete = True
-                            st.balloons()
-                
-                with col2:
-                    # Retry button if supported
-                    if current_node_config.get('retry') and st.button("Retry"):
-                        if st.session_state.messages:
-                            st.session_state.messages.pop()
-                        st.info("You can provide a new response for this section.")
-                
-                with col3:
-                    # Skip button if supported
-                    if current_node_config.get('skip') and st.button("Skip"):
-                        next_node_id = st.session_state.config_manager.get_next_node(st.session_state.current_node)
-                        if next_node_id and next_node_id != "complete":
-                            st.session_state.current_node = next_node_id
-                            st.session_state.current_node_started = False
-                            st.info("Skipped to next section.")
-                
-                st.rerun()
+            
+            # Move on once the section is clear enough
+            if is_complete:
+                next_node_id = complete_current_node()
+                if next_node_id:
+                    next_node_config = st.session_state.config_manager.get_node_config(next_node_id)
+                    st.success(f"Moving to {next_node_config['label']}!")
+                    time.sleep(1)
+            
+            st.rerun()
+        
+        # Node controls in one form: applying an action costs a single rerun
+        if st.session_state.messages:
+            actions = ["Complete Current Section"]
+            if current_node_config.get('retry'):
+                actions.append("Retry")
+            if current_node_config.get('skip'):
+                actions.append("Skip")
+            
+            with st.form("node_actions", border=False):
+                st.radio("Action", actions, horizontal=True, key="node_action")
+                st.form_submit_button("Apply", on_click=apply_node_action)
     
     # Enhanced completion
     elif st.session_state.complete:
@@ -1,16 +1,33 @@
 import streamlit as st
 import asyncio
 import json
+import os
+import re
 import yaml
 import logging
+import time
+import threading
+import weakref
 import httpx
+from collections import OrderedDict, deque
+from functools import lru_cache
+from itertools import islice
+from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
 from crawl4ai.extraction_strategy import JsonCssExtractionStrategy
 from clarification_agent.core.conversation_agent import ConversationAgent
 from web_search_config import WebSearchConfig
-from agent_activity_logger import AgentActivityLogger, ActivityType, ActivityContext
+from agent_activity_logger import AgentActivityLogger, ActivityType, ActivityStatus, ActivityContext
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(
@@ -23,19 +40,106 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# URLs in crawled markdown, and the markdown formatting dropped from summaries.
+# One bounded character class, so matching stays linear on large pages.
+_URL_RE = re.compile(r'\bhttps?://[^\s<>"\'\)]{1,2048}', re.ASCII)
+# Sentence punctuation that the URL pattern picks up at the end of a link
+_URL_TRAILING = ".,;:!?"
+# Search engines and social sites whose links are not useful results
+_EXCLUDE_DOMAINS = frozenset({'google.com', 'bing.com', 'duckduckgo.com', 'facebook.com', 'twitter.com', 'youtube.com'})
+_MD_STRIP_TABLE = str.maketrans('', '', '#*`[]()')
+# A "# Title" heading line, looked for in the first few KB of a page
+_TITLE_RE = re.compile(r'^[ \t]*# [ \t]*(\S.*)$', re.M)
+_TITLE_SCAN_CHARS = 4096
+
+# Headless browser used for all crawling
+_BROWSER_CONFIG = BrowserConfig(headless=True)
+
+# Search result pages are always fetched fresh; result pages may come from crawl4ai's cache
+_SEARCH_RUN_CONFIG = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
+_PAGE_RUN_CONFIG = CrawlerRunConfig(cache_mode=CacheMode.ENABLED)
+
+# HEAD probes that decide whether a result URL is worth a browser crawl
+_PROBE_TIMEOUT = 5  # seconds
+_PROBE_LIMITS = httpx.Limits(max_connections=20)
+
+# Chat messages shown on each rerun unless full history is requested
+_RECENT_MESSAGES = 50
+
+# Completed searches kept in memory; older ones are dropped
+_MAX_SEARCH_HISTORY = 50
+
+# Parsed result pages kept per search tool
+_PAGE_CACHE_MAX_ENTRIES = 512
+_PAGE_CACHE_TTL = 3600  # seconds
+
+# Conversational filler stripped from user input before searching
+_REMOVE_RE = re.compile(r'\b(?:can you|please|help me|i want to|i need)\b', re.I)
+
+@lru_cache(maxsize=256)
+def _should_search(user_input: str) -> bool:
+    """Whether user_input should trigger a web search; cached across reruns"""
+    return WebSearchConfig.should_trigger_search(user_input)
+
+@lru_cache(maxsize=256)
+def _extract_search_query(user_input: str) -> str:
+    """The search query for user_input, with filler words removed"""
+    # Simple extraction - could be enhanced with NLP
+    return _REMOVE_RE.sub("", user_input).strip()
+
+def _paragraphs(text: str):
+    """Yield the blank-line separated paragraphs of text, scanning only as far as needed"""
+    start = 0
+    while True:
+        end = text.find('\n\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 2
+
 st.set_page_config(
     page_title="🧠 Enhanced Clarification Agent with Activity Logs",
     page_icon="🧠",
     layout="wide"
 )
 
+@dataclass(slots=True)
+class SearchBatch:
+    """A completed search kept in history, with its results stored column by column"""
+    query: str
+    engine: str
+    titles: List[str]
+    urls: List[str]
+    contents: List[str]
+    timestamps: List[str]
+    
+    @classmethod
+    def from_results(cls, results: Dict[str, Any]) -> "SearchBatch":
+        """Build a batch from the dict returned by search_web"""
+        items = results.get("results", [])
+        return cls(
+            query=results.get("query", "N/A"),
+            engine=results.get("engine", "N/A"),
+            titles=[item["title"] for item in items],
+            urls=[item["url"] for item in items],
+            contents=[item["content"] for item in items],
+            timestamps=[item["timestamp"] for item in items],
+        )
+
 class EnhancedWebSearchTool:
     """Enhanced web search tool with activity logging"""
     
     def __init__(self, activity_logger: AgentActivityLogger):
         self.config = WebSearchConfig()
-        self.search_history = []
+        self.search_history = deque(maxlen=_MAX_SEARCH_HISTORY)
         self.activity_logger = activity_logger
+        # Browser crawler and HTTP client, started on first search and kept running between searches
+        self._crawler = None
+        self._http = None
+        self._crawler_loop = None
+        # Parsed result pages by URL: url -> (crawled at, (title, summary))
+        self._page_cache = OrderedDict()
         
         # Setup environment for crawl4ai
         self.config.setup_environment()
@@ -62,10 +166,6 @@ class EnhancedWebSearchTool:
                 search_url = self.config.get_search_engine_url(engine)
                 full_url = search_url + query.replace(" ", "+")
                 
-                # Configure browser for crawling
-                browser_conf = BrowserConfig(headless=True)
-                run_conf = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
-                
                 # Search results container
                 results = {
                     "query": query,
@@ -81,117 +181,80 @@ class EnhancedWebSearchTool:
                     {"search_url": full_url}
                 )
                 
-                async with AsyncWebCrawler(config=browser_conf) as crawler:
-                    # Crawl search results page
-                    logger.info(f"Crawling search results from: {full_url}")
+                crawler = await self._get_crawler()
+                
+                # Crawl search results page
+                logger.info(f"Crawling search results from: {full_url}")
+                
+                # Log crawler activity
+                crawler_id = self.activity_logger.start_activity(
+                    ActivityType.TOOL_CALL,
+                    "🕷️ Web Crawler",
+                    f"Crawling search results page"
+                )
+                
+                search_result = await crawler.arun(url=full_url, config=_SEARCH_RUN_CONFIG)
+                
+                self.activity_logger.complete_activity(
+                    crawler_id,
+                    f"Search results page crawled successfully",
+                    {"content_length": len(search_result.markdown) if search_result.markdown else 0}
+                )
+                
+                if search_result and search_result.markdown:
+                    # Extract URLs from markdown content
+                    urls = self._extract_urls_from_markdown(search_result.markdown)
                     
-                    # Log crawler activity
-                    crawler_id = self.activity_logger.start_activity(
-                        ActivityType.TOOL_CALL,
-                        "🕷️ Web Crawler",
-                        f"Crawling search results page"
+                    activity.update(
+                        f"Found {len(urls)} potential result URLs",
+                        {"urls_found": len(urls)}
                     )
                     
-                    search_result = await crawler.arun(url=full_url, config=run_conf)
+                    # Crawl individual result pages concurrently, a bounded number at a time
+                    semaphore = asyncio.BoundedSemaphore(min(max_results, 8))
+                    page_results = await asyncio.gather(*(
+                        self._crawl_page(crawler, url, i, semaphore)
+                        for i, url in enumerate(urls[:max_results])
+                    ))
                     
-                    self.activity_logger.complete_activity(
-                        crawler_id,
-                        f"Search results page crawled successfully",
-                        {"content_length": len(search_result.markdown) if search_result.markdown else 0}
-                    )
+                    self.activity_logger.log_activities([activity for _, _, activity in page_results])
                     
-                    if search_result and search_result.markdown:
-                        # Extract URLs from markdown content
-                        urls = self._extract_urls_from_markdown(search_result.markdown)
-                        
-                        activity.update(
-                            f"Found {len(urls)} potential result URLs",
-                            {"urls_found": len(urls)}
-                        )
-                        
-                        # Crawl individual result pages
-                        for i, url in enumerate(urls[:max_results]):
-                            if self._is_valid_url(url):
-                                try:
-                                    # Log individual page crawling
-                                    page_id = self.activity_logger.start_activity(
-                                        ActivityType.TOOL_CALL,
-                                        f"📄 Page Crawler #{i+1}",
-                                        f"Crawling: {url[:50]}..."
-                                    )
-                                    
-                                    logger.info(f"Crawling result {i+1}: {url}")
-                                    page_result = await crawler.arun(url=url, config=run_conf)
-                                    
-                                    if page_result and page_result.markdown:
-                                        # Extract relevant content
-                                        content_summary = self._extract_content_summary(page_result.markdown)
-                                        
-                                        result_item = {
-                                            "title": self._extract_title(page_result.markdown),
-                                            "url": url,
-                                            "content": content_summary,
-                                            "timestamp": datetime.now().isoformat()
-                                        }
-                                        
-                                        results["results"].append(result_item)
-                                        
-                                        # Add citation
-                                        citation = f"[{i+1}] {result_item['title']} - {url}"
-                                        results["citations"].append(citation)
-                                        
-                                        self.activity_logger.complete_activity(
-                                            page_id,
-                                            f"Page crawled: {result_item['title']}",
-                                            {
-                                                "title": result_item['title'],
-                                                "content_length": len(content_summary),
-                                                "url": url
-                                            }
-                                        )
-                                    else:
-                                        self.activity_logger.fail_activity(
-                                            page_id,
-                                            "No content extracted from page"
-                                        )
-                                        
-                                except Exception as e:
-                                    logger.error(f"Error crawling {url}: {str(e)}")
-                                    self.activity_logger.fail_activity(
-                                        page_id,
-                                        f"Crawling failed: {str(e)}"
-                                    )
-                                    continue
-                    
-                    # Generate summary of all results
-                    if results["results"]:
-                        summary_id = self.activity_logger.start_activity(
-                            ActivityType.ANALYSIS,
-                            "📊 Results Analysis",
-                            "Generating search results summary"
-                        )
-                        
-                        results["summary"] = self._generate_search_summary(results["results"], query)
-                        
-                        self.activity_logger.complete_activity(
-                            summary_id,
-                            f"Summary generated for {len(results['results'])} results"
-                        )
-                    
-                    # Add to search history
-                    self.search_history.append(results)
-                    logger.info(f"Search completed. Found {len(results['results'])} results")
-                    
-                    activity.update(
-                        f"Search completed successfully",
-                        {
-                            "results_count": len(results['results']),
-                            "citations_count": len(results['citations'])
-                        }
+                    for i, result_item, _ in page_results:
+                        if result_item:
+                            results["results"].append(result_item)
+                            
+                            # Add citation
+                            results["citations"].append(f"[{i+1}] {result_item['title']} - {result_item['url']}")
+                
+                # Generate summary of all results
+                if results["results"]:
+                    summary_id = self.activity_logger.start_activity(
+                        ActivityType.ANALYSIS,
+                        "📊 Results Analysis",
+                        "Generating search results summary"
                     )
                     
-                    return results
+                    results["summary"] = self._generate_search_summary(results["results"], query)
                     
+                    self.activity_logger.complete_activity(
+                        summary_id,
+                        f"Summary generated for {len(results['results'])} results"
+                    )
+                
+                # Add to search history
+                self.search_history.append(SearchBatch.from_results(results))
+                logger.info(f"Search completed. Found {len(results['results'])} results")
+                
+                activity.update(
+                    f"Search completed successfully",
+                    {
+                        "results_count": len(results['results']),
+                        "citations_count": len(results['citations'])
+                    }
+                )
+                
+                return results
+                
             except Exception as e:
                 logger.error(f"Error in web search: {str(e)}")
                 return {
@@ -203,69 +266,181 @@ class EnhancedWebSearchTool:
                     "summary": f"Error occurred during search: {str(e)}"
                 }
     
-    def _extract_urls_from_markdown(self, markdown_content: str) -> List[str]:
-        """Extract URLs from markdown content"""
-        import re
-        
-        # Pattern to match URLs in markdown
-        url_pattern = r'https?://[^\s\)]+(?:\([^\)]*\))?[^\s\.,;!?]*'
-        urls = re.findall(url_pattern, markdown_content)
-        
-        # Filter out search engine URLs and common non-content URLs
-        filtered_urls = []
-        exclude_domains = ['google.com', 'bing.com', 'duckduckgo.com', 'facebook.com', 'twitter.com', 'youtube.com']
-        
-        for url in urls:
-            if not any(domain in url for domain in exclude_domains):
-                filtered_urls.append(url)
-        
-        return list(set(filtered_urls))  # Remove duplicates
+    async def _get_crawler(self) -> AsyncWebCrawler:
+        """Get the browser crawler, starting it on first use.
+
+        The browser is tied to the event loop it was started on, so a new one is
+        started if searches move to a different loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._crawler is None or self._crawler_loop is not loop:
+            crawler = AsyncWebCrawler(config=_BROWSER_CONFIG)
+            await crawler.__aenter__()
+            self._crawler, self._crawler_loop = crawler, loop
+            # The HTTP client's connections belong to the same loop
+            self._http = httpx.AsyncClient(
+                timeout=_PROBE_TIMEOUT, limits=_PROBE_LIMITS, follow_redirects=True
+            )
+        return self._crawler
     
-    def _is_valid_url(self, url: str) -> bool:
-        """Check if URL is valid and accessible"""
+    async def close(self) -> None:
+        """Shut down the browser crawler and HTTP client, if running"""
+        if self._crawler is not None:
+            crawler, self._crawler, self._crawler_loop = self._crawler, None, None
+            http, self._http = self._http, None
+            await crawler.__aexit__(None, None, None)
+            await http.aclose()
+    
+    async def _probe(self, url: str) -> bool:
+        """Whether a HEAD request suggests url is a reachable HTML page worth crawling"""
         try:
-            return url.startswith(('http://', 'https://')) and len(url) > 10
-        except:
+            response = await self._http.head(url)
+        except httpx.HTTPError:
             return False
+        if response.status_code == 405:
+            # HEAD not supported; let the browser find out
+            return True
+        return response.status_code == 200 and "text/html" in response.headers.get("content-type", "")
+    
+    async def _crawl_page(self, crawler, url: str, i: int, semaphore: asyncio.BoundedSemaphore) -> tuple:
+        """Crawl one result page; returns (i, result item or None, its finished activity)"""
+        # The activity is recorded by the caller, batched with the other pages
+        activity = self.activity_logger.create_activity(
+            ActivityType.TOOL_CALL,
+            f"📄 Page Crawler #{i+1}",
+            f"Crawling: {url[:50]}..."
+        )
+        
+        try:
+            page = self._get_cached_page(url)
+            if page is None:
+                # Skip dead links and non-HTML files without starting a browser tab
+                if not await self._probe(url):
+                    activity.finish(ActivityStatus.FAILED, "Skipped: not a reachable HTML page")
+                    return i, None, activity
+                
+                logger.info(f"Crawling result {i+1}: {url}")
+                async with semaphore:
+                    page_result = await crawler.arun(url=url, config=_PAGE_RUN_CONFIG)
+                
+                if page_result and page_result.markdown:
+                    # Extract relevant content
+                    page = (
+                        self._extract_title(page_result.markdown),
+                        self._extract_content_summary(page_result.markdown)
+                    )
+                    self._cache_page(url, page)
+            
+            if page:
+                title, content_summary = page
+                result_item = {
+                    "title": title,
+                    "url": url,
+                    "content": content_summary,
+                    "timestamp": datetime.now().isoformat()
+                }
+                
+                activity.finish(
+                    ActivityStatus.COMPLETED,
+                    f"Page crawled: {result_item['title']}",
+                    {
+                        "title": result_item['title'],
+                        "content_length": len(content_summary),
+                        "url": url
+                    }
+                )
+                return i, result_item, activity
+            
+            activity.finish(ActivityStatus.FAILED, "No content extracted from page")
+                
+        except Exception as e:
+            logger.error(f"Error crawling {url}: {str(e)}")
+            activity.finish(ActivityStatus.FAILED, f"Crawling failed: {str(e)}")
+        return i, None, activity
+    
+    def _get_cached_page(self, url: str) -> Optional[tuple]:
+        """Get the (title, summary) of a recently crawled page, if still fresh"""
+        entry = self._page_cache.get(url)
+        if entry is None:
+            return None
+        if time.time() - entry[0] >= _PAGE_CACHE_TTL:
+            del self._page_cache[url]
+            return None
+        self._page_cache.move_to_end(url)
+        return entry[1]
+    
+    def _cache_page(self, url: str, page: tuple) -> None:
+        """Remember a crawled page's (title, summary), evicting the least recently used"""
+        self._page_cache[url] = (time.time(), page)
+        self._page_cache.move_to_end(url)
+        if len(self._page_cache) > _PAGE_CACHE_MAX_ENTRIES:
+            self._page_cache.popitem(last=False)
+    
+    def _extract_urls_from_markdown(self, markdown_content: str) -> List[str]:
+        """Extract valid, non-search-engine URLs from markdown content"""
+        # Filter out search engine URLs and common non-content URLs,
+        # removing duplicates while keeping the page order
+        seen = {}
+        for url in _URL_RE.findall(markdown_content):
+            url = url.rstrip(_URL_TRAILING)
+            if url in seen:
+                continue
+            try:
+                parts = urlsplit(url)
+                host = parts.hostname or ""
+            except ValueError:
+                continue
+            # Only crawlable links with a plausible host reach the crawl loop
+            if parts.scheme not in ("http", "https") or len(parts.netloc) < 4:
+                continue
+            # Compare the registered domain, so subdomains (www., m.) are excluded too
+            if ".".join(host.rsplit(".", 2)[-2:]) not in _EXCLUDE_DOMAINS:
+                seen[url] = None
+        
+        return list(seen)
     
     def _extract_title(self, markdown_content: str) -> str:
         """Extract title from markdown content"""
-        lines = markdown_content.split('\n')
-        for line in lines:
-            if line.strip().startswith('# '):
-                return line.strip()[2:]
-        return "Untitled"
+        # Most crawled pages open with their "# Title" line, so check that first
+        head = markdown_content.lstrip().partition('\n')[0].strip()
+        if head.startswith('# '):
+            return head[2:].strip()
+        
+        # Otherwise titles sit near the top, so only the start of the page is scanned
+        match = _TITLE_RE.search(markdown_content, 0, _TITLE_SCAN_CHARS)
+        return match.group(1).strip() if match else "Untitled"
     
     def _extract_content_summary(self, markdown_content: str, max_length: int = 500) -> str:
         """Extract a summary of the content"""
-        # Remove markdown formatting
-        import re
-        clean_content = re.sub(r'[#*`\[\]()]', '', markdown_content)
-        
-        # Get first few paragraphs
-        paragraphs = [p.strip() for p in clean_content.split('\n\n') if p.strip()]
-        
-        summary = ""
-        for paragraph in paragraphs[:3]:  # Take first 3 paragraphs
-            if len(summary + paragraph) < max_length:
-                summary += paragraph + " "
-            else:
+        # Take the first few paragraphs that fit, removing markdown formatting
+        # from just those rather than from the whole page
+        summary = []
+        length = 0
+        for paragraph in _paragraphs(markdown_content):
+            paragraph = paragraph.translate(_MD_STRIP_TABLE).strip()
+            if not paragraph:
+                continue
+            if length + len(paragraph) >= max_length:
+                break
+            summary.append(paragraph)
+            length += len(paragraph) + 1
+            if len(summary) == 3:  # Take first 3 paragraphs
                 break
         
-        return summary.strip()[:max_length] + "..." if len(summary) > max_length else summary.strip()
+        return " ".join(summary)
     
     def _generate_search_summary(self, results: List[Dict], query: str) -> str:
         """Generate a summary of search results"""
         if not results:
             return "No results found."
         
-        summary = f"Found {len(results)} relevant results for '{query}':\n\n"
+        parts = [f"Found {len(results)} relevant results for '{query}':\n"]
+        parts.extend(
+            f"{i}. **{result['title']}**\n   {result['content'][:200]}...\n"
+            for i, result in enumerate(results, 1)
+        )
         
-        for i, result in enumerate(results, 1):
-            summary += f"{i}. **{result['title']}**\n"
-            summary += f"   {result['content'][:200]}...\n\n"
-        
-        return summary
+        return "\n".join(parts) + "\n"
 
 class SuperEnhancedConversationAgent(ConversationAgent):
     """Enhanced conversation agent with detailed activity logging"""
@@ -363,43 +538,114 @@ class SuperEnhancedConversationAgent(ConversationAgent):
     
     def _should_search(self, user_input: str) -> bool:
         """Determine if web search should be performed"""
-        return WebSearchConfig.should_trigger_search(user_input)
+        return _should_search(user_input)
     
     def _extract_search_query(self, user_input: str) -> str:
         """Extract search query from user input"""
-        # Simple extraction - could be enhanced with NLP
-        query = user_input.strip()
-        
-        # Remove common conversational words
-        remove_words = ["can you", "please", "help me", "i want to", "i need"]
-        for word in remove_words:
-            query = query.replace(word, "").strip()
-        
-        return query
+        return _extract_search_query(user_input)
     
     def _enhance_response_with_search(self, original_response: str, search_results: Dict) -> str:
         """Enhance agent response with search results"""
         if not search_results.get("results"):
             return original_response
         
-        enhanced = original_response + "\n\n"
-        enhanced += "🔍 **Web Search Results:**\n\n"
-        enhanced += search_results.get("summary", "")
-        enhanced += "\n\n**Sources:**\n"
-        
-        for citation in search_results.get("citations", []):
-            enhanced += f"- {citation}\n"
+        parts = [
+            original_response,
+            "",
+            "🔍 **Web Search Results:**",
+            "",
+            search_results.get("summary", ""),
+            "",
+            "**Sources:**",
+        ]
+        parts.extend(f"- {citation}" for citation in search_results.get("citations", []))
         
-        return enhanced
+        return "\n".join(parts) + "\n"
+
+@st.cache_data
+def _read_project_file(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a project file (with orjson when installed); mtime is part of the cache key so edits are picked up"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
 
 def load_project_data(project_name):
     """Load project data from .clarity folder if it exists"""
-    import os
     clarity_path = os.path.join(".clarity", f"{project_name}.json")
-    if os.path.exists(clarity_path):
-        with open(clarity_path, "r") as f:
-            return json.load(f)
-    return None
+    try:
+        mtime = os.stat(clarity_path).st_mtime
+    except OSError:
+        return None
+    return _read_project_file(clarity_path, mtime)
+
+@st.cache_data
+def _scan_projects(mtime: float) -> List[str]:
+    """Names of the saved projects, cached per .clarity directory mtime"""
+    with os.scandir(".clarity") as entries:
+        return sorted(e.name[:-5] for e in entries if e.name.endswith(".json") and e.is_file())
+
+def list_projects() -> List[str]:
+    """Project names from the .clarity folder; only rescanned when it changes"""
+    try:
+        mtime = os.stat(".clarity").st_mtime
+    except OSError:
+        return []
+    return _scan_projects(mtime)
+
+def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+    loop.close()
+
+def _shutdown_loop(loop: asyncio.AbstractEventLoop, thread: threading.Thread, tools: list) -> None:
+    """Close the browsers still running on loop, then stop it."""
+    async def shutdown():
+        for tool in tools:
+            await tool.close()
+        loop.stop()
+    
+    future = asyncio.run_coroutine_threadsafe(shutdown(), loop)
+    # Wait for the browsers to exit, unless called from the loop's own thread
+    if threading.current_thread() is not thread:
+        try:
+            future.result(timeout=10)
+        except Exception as e:
+            logger.error(f"Error shutting down search loop: {str(e)}")
+
+class _SessionLoop:
+    """A session's event loop on a daemon thread, shut down when the session is dropped"""
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        # Search tools with a browser on this loop; closed at shutdown
+        self.tools = []
+        thread = threading.Thread(target=_run_loop, args=(self.loop,), name="search-loop", daemon=True)
+        thread.start()
+        # Runs when the session state is garbage collected, or at interpreter exit
+        weakref.finalize(self, _shutdown_loop, self.loop, thread, self.tools)
+
+async def _with_script_ctx(coro, ctx):
+    """Await a coroutine with the caller's Streamlit context attached to the loop thread."""
+    # The activity logger reads st.session_state, which needs the current run's context
+    add_script_run_ctx(threading.current_thread(), ctx)
+    return await coro
+
+def _run_async(coro):
+    """Run a coroutine on the session's background loop and wait for its result."""
+    future = asyncio.run_coroutine_threadsafe(
+        _with_script_ctx(coro, get_script_run_ctx()), st.session_state.search_loop.loop
+    )
+    return future.result()
+
+def _set_agent(agent: "SuperEnhancedConversationAgent") -> None:
+    """Make agent the session's agent, closing the browser of the one it replaces."""
+    tools = st.session_state.search_loop.tools
+    if st.session_state.agent is not None:
+        previous = st.session_state.agent.web_search
+        _run_async(previous.close())
+        tools.remove(previous)
+    tools.append(agent.web_search)
+    st.session_state.agent = agent
 
 async def main():
     st.title("🧠 Enhanced Clarification Agent with Beautiful Activity Logs")
@@ -413,7 +659,11 @@ async def main():
         st.session_state.agent = None
         st.session_state.project_name = None
         st.session_state.complete = False
-        st.session_state.search_history = []
+        st.session_state.search_history = deque(maxlen=_MAX_SEARCH_HISTORY)
+    
+    # One event loop per session, so the crawler and its browser survive between turns
+    if "search_loop" not in st.session_state:
+        st.session_state.search_loop = _SessionLoop()
     
     # Initialize activity logger
     if "activity_logger" not in st.session_state:
@@ -442,11 +692,11 @@ async def main():
             project_name = st.text_input("Project Name:")
             if st.button("Start New Project") and project_name:
                 # Initialize new enhanced conversation agent
-                st.session_state.agent = SuperEnhancedConversationAgent(project_name=project_name)
+                _set_agent(SuperEnhancedConversationAgent(project_name=project_name))
                 st.session_state.project_name = project_name
                 st.session_state.messages = []
                 st.session_state.complete = False
-                st.session_state.search_history = []
+                st.session_state.search_history = deque(maxlen=_MAX_SEARCH_HISTORY)
                 
                 # Clear activity logs for new project
                 st.session_state.activity_logger.clear_logs()
@@ -457,31 +707,27 @@ async def main():
                 st.rerun()
         else:
             # List existing projects from .clarity folder
-            import os
-            if os.path.exists(".clarity"):
-                projects = [f.replace(".json", "") for f in os.listdir(".clarity") if f.endswith(".json")]
-                if projects:
-                    selected_project = st.selectbox("Select a project:", projects)
-                    if st.button("Load Project"):
-                        project_data = load_project_data(selected_project)
-                        st.session_state.agent = SuperEnhancedConversationAgent(
-                            project_name=selected_project,
-                            project_data=project_data
-                        )
-                        st.session_state.project_name = selected_project
-                        st.session_state.messages = []
-                        st.session_state.complete = False
-                        st.session_state.search_history = []
-                        
-                        # Clear activity logs for loaded project
-                        st.session_state.activity_logger.clear_logs()
-                        
-                        # Get initial message from agent
-                        initial_message, _ = st.session_state.agent.process_user_input("")
-                        st.session_state.messages.append({"role": "assistant", "content": initial_message})
-                        st.rerun()
-                else:
-                    st.info("No existing projects found.")
+            projects = list_projects()
+            if projects:
+                selected_project = st.selectbox("Select a project:", projects)
+                if st.button("Load Project"):
+                    project_data = load_project_data(selected_project)
+                    _set_agent(SuperEnhancedConversationAgent(
+                        project_name=selected_project,
+                        project_data=project_data
+                    ))
+                    st.session_state.project_name = selected_project
+                    st.session_state.messages = []
+                    st.session_state.complete = False
+                    st.session_state.search_history = deque(maxlen=_MAX_SEARCH_HISTORY)
+                    
+                    # Clear activity logs for loaded project
+                    st.session_state.activity_logger.clear_logs()
+                    
+                    # Get initial message from agent
+                    initial_message, _ = st.session_state.agent.process_user_input("")
+                    st.session_state.messages.append({"role": "assistant", "content": initial_message})
+                    st.rerun()
             else:
                 st.info("No existing projects found.")
         
@@ -510,8 +756,12 @@ async def main():
     with col1:
         st.subheader("💬 Conversation")
         
-        # Display chat messages
-        for message in st.session_state.messages:
+        # Display chat messages: only the most recent unless full history is requested
+        messages = st.session_state.messages
+        hidden = max(len(messages) - _RECENT_MESSAGES, 0)
+        if hidden and st.sidebar.checkbox("Show full history", value=False):
+            hidden = 0
+        for message in islice(messages, hidden, None):
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
         
@@ -525,11 +775,8 @@ async def main():
                 # Show activity in real-time
                 with st.status("🤖 Agent is working...", expanded=True) as status:
                     try:
-                        # Use asyncio to run the async method
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        
-                        agent_response, is_complete, search_results = loop.run_until_complete(
+                        # Run the async method on the session's background loop
+                        agent_response, is_complete, search_results = _run_async(
                             st.session_state.agent.process_user_input_with_logging(
                                 user_input, 
                                 enable_search=enable_search
@@ -541,9 +788,8 @@ async def main():
                         
                         # Add search results to history
                         if search_results:
-                            st.session_state.search_history.append(search_results)
+                            st.session_state.search_history.append(SearchBatch.from_results(search_results))
                         
-                        loop.close()
                         status.update(label="✅ Processing complete!", state="complete")
                         
                     except Exception as e:
@@ -579,18 +825,19 @@ async def main():
         if st.session_state.search_history:
             latest_search = st.session_state.search_history[-1]
             
-            st.write(f"**Latest Query:** {latest_search.get('query', 'N/A')}")
-            st.write(f"**Engine:** {latest_search.get('engine', 'N/A')}")
-            st.write(f"**Results Found:** {len(latest_search.get('results', []))}")
+            st.write(f"**Latest Query:** {latest_search.query}")
+            st.write(f"**Engine:** {latest_search.engine}")
+            st.write(f"**Results Found:** {len(latest_search.urls)}")
             
-            if latest_search.get("results"):
+            if latest_search.urls:
                 st.divider()
                 st.subheader("📄 Sources")
                 
-                for i, result in enumerate(latest_search["results"], 1):
-                    with st.expander(f"{i}. {result.get('title', 'Untitled')}"):
-                        st.write(f"**URL:** {result.get('url', 'N/A')}")
-                        st.write(f"**Content:** {result.get('content', 'No content available')}")
+                columns = zip(latest_search.titles, latest_search.urls, latest_search.contents)
+                for i, (title, url, content) in enumerate(columns, 1):
+                    with st.expander(f"{i}. {title or 'Untitled'}"):
+                        st.write(f"**URL:** {url}")
+                        st.write(f"**Content:** {content or 'No content available'}")
             
             # Manual search option
             st.divider()
@@ -600,10 +847,7 @@ async def main():
             if st.button("Search") and manual_query and st.session_state.agent:
                 with st.spinner("Searching..."):
                     try:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        
-                        search_results = loop.run_until_complete(
+                        search_results = _run_async(
                             st.session_state.agent.web_search.search_web(
                                 manual_query, 
                                 engine=search_engine, 
@@ -611,8 +855,7 @@ async def main():
                             )
                         )
                         
-                        st.session_state.search_history.append(search_results)
-                        loop.close()
+                        st.session_state.search_history.append(SearchBatch.from_results(search_results))
                         st.rerun()
                         
                     except Exception as e:
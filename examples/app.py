@@ -1,9 +1,14 @@
 
 import streamlit as st
+import asyncio
+import queue
+import threading
+import aiosqlite
 from typing import TypedDict, List, Dict, Annotated
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, AIMessageChunk
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.config import get_stream_writer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from dotenv import load_dotenv
 import os
 from langchain_openai import ChatOpenAI
@@ -23,7 +28,9 @@ llm = ChatOpenAI(
     model="microsoft/mai-ds-r1:free",  # You can choose other models from OpenRouter
     openai_api_key=OPENROUTER_API_KEY,
     openai_api_base="https://openrouter.ai/api/v1",
-    temperature=0.7
+    temperature=0.7,
+    streaming=True,  # Tokens reach the UI as they are generated
+    stream_usage=True  # Token usage arrives in the stream, no extra call needed
 )
 
 # --- LangGraph State Definition ---
@@ -36,14 +43,15 @@ class ClarificationState(TypedDict):
     project_context: str
 
 # --- LangGraph Nodes ---
-def requirements_analyzer_node(state: ClarificationState):
-    st.write("Running Requirements Analyzer...")
+async def requirements_analyzer_node(state: ClarificationState):
+    # Status lines reach the page through the "custom" stream; nodes run off the script thread
+    get_stream_writer()("Running Requirements Analyzer...")
     prompt = ChatPromptTemplate.from_messages([
         ("system", "You are an expert requirements analyst. Extract key requirements and identify potential gaps or unclear specifications from the given project description."),
         ("user", "Project Description: {project_context}")
     ])
     chain = prompt | llm | StrOutputParser()
-    response = chain.invoke({"project_context": state["project_context"]})
+    response = await chain.ainvoke({"project_context": state["project_context"]})
     
     # Simple parsing for demonstration; in a real app, use Pydantic for structured output
     requirements = [req.strip() for req in response.split("\n") if req.strip() and "requirement" in req.lower()]
@@ -51,8 +59,8 @@ def requirements_analyzer_node(state: ClarificationState):
     
     return {"requirements": requirements, "ambiguities": ambiguities, "messages": [AIMessage(content=f"Requirements analyzed. Found {len(ambiguities)} ambiguities.")]}
 
-def ambiguity_detector_node(state: ClarificationState):
-    st.write("Running Ambiguity Detector...")
+async def ambiguity_detector_node(state: ClarificationState):
+    get_stream_writer()("Running Ambiguity Detector...")
     if not state.get("requirements"):
         return {"ambiguities": [], "clarification_status": "complete", "messages": [AIMessage(content="No requirements to analyze.")]}
 
@@ -61,15 +69,15 @@ def ambiguity_detector_node(state: ClarificationState):
         ("user", "Requirements: {requirements}\n\nProject Context: {project_context}")
     ])
     chain = prompt | llm | StrOutputParser()
-    response = chain.invoke({"requirements": "\n".join(state["requirements"]), "project_context": state["project_context"]})
+    response = await chain.ainvoke({"requirements": "\n".join(state["requirements"]), "project_context": state["project_context"]})
     
     # Simple parsing for demonstration
     ambiguities = [amb.strip() for amb in response.split("\n") if amb.strip()]
     
     return {"ambiguities": ambiguities, "messages": [AIMessage(content=f"Ambiguities detected: {', '.join(ambiguities) if ambiguities else 'None'}.")]}
 
-def question_generator_node(state: ClarificationState):
-    st.write("Running Question Generator...")
+async def question_generator_node(state: ClarificationState):
+    get_stream_writer()("Running Question Generator...")
     if not state.get("ambiguities"):
         return {"messages": [AIMessage(content="No ambiguities to generate questions for.")]}
 
@@ -78,14 +86,14 @@ def question_generator_node(state: ClarificationState):
         ("user", "Ambiguities: {ambiguities}\n\nProject Context: {project_context}")
     ])
     chain = prompt | llm | StrOutputParser()
-    response = chain.invoke({"ambiguities": "\n".join(state["ambiguities"]), "project_context": state["project_context"]})
+    response = await chain.ainvoke({"ambiguities": "\n".join(state["ambiguities"]), "project_context": state["project_context"]})
     
     questions = [q.strip() for q in response.split("\n") if q.strip()]
     
     return {"messages": [AIMessage(content="Please answer the following questions to clarify the requirements:\n" + "\n".join(questions))]}
 
-def response_processor_node(state: ClarificationState):
-    st.write("Running Response Processor...")
+async def response_processor_node(state: ClarificationState):
+    get_stream_writer()("Running Response Processor...")
     latest_human_response = None
     for msg in reversed(state["messages"]):
         if isinstance(msg, HumanMessage):
@@ -100,7 +108,7 @@ def response_processor_node(state: ClarificationState):
         ("user", "Original Ambiguities: {ambiguities}\n\nStakeholder Response: {response}\n\nProject Context: {project_context}")
     ])
     chain = prompt | llm | StrOutputParser()
-    response_analysis = chain.invoke({
+    response_analysis = await chain.ainvoke({
         "ambiguities": "\n".join(state["ambiguities"]),
         "response": latest_human_response,
         "project_context": state["project_context"]
@@ -129,8 +137,8 @@ def response_processor_node(state: ClarificationState):
         "messages": [AIMessage(content=f"Response processed. Status: {clarification_status}. Analysis: {response_analysis}")]
     }
 
-def human_in_the_loop_node(state: ClarificationState):
-    st.write("Awaiting human input for clarification...")
+async def human_in_the_loop_node(state: ClarificationState):
+    get_stream_writer()("Awaiting human input for clarification...")
     # This node simply signals that human input is needed.
     # The Streamlit chat_input handles capturing this.
     return {"clarification_status": "incomplete"} # Keep status incomplete until human responds
@@ -171,48 +179,124 @@ workflow.add_edge("question_generator", "human_in_the_loop") # After generating
 workflow.add_edge("human_in_the_loop", "response_processor") # After human input, process response
 workflow.add_edge("response_processor", "ambiguity_detector") # Re-evaluate after processing response
 
-memory = SqliteSaver.from_conn_string("sqlite:///clarification_history.db")
-graph = workflow.compile(checkpointer=memory)
+# --- Async runtime ---
+@st.cache_resource
+def get_event_loop():
+    """One event loop on a daemon thread, shared by every rerun and session."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
 
-# --- Streamlit UI ---
-st.title("Clarification AI Agent")
+def run_async(coro):
+    """Run a coroutine on the shared loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
 
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-if "run_id" not in st.session_state:
-    st.session_state.run_id = None
+async def _open_checkpointer():
+    conn = await aiosqlite.connect("clarification_history.db")
+    # WAL lets readers run alongside the writer; NORMAL sync is safe under WAL
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    await conn.execute("PRAGMA temp_store=MEMORY")
+    return AsyncSqliteSaver(conn)
 
-for message in st.session_state.messages:
-    with st.chat_message(message.type):
-        st.markdown(message.content)
+@st.cache_resource
+def get_graph():
+    """Open the checkpoint database and compile the graph once, not on every rerun."""
+    return workflow.compile(checkpointer=run_async(_open_checkpointer()))
 
-if prompt := st.chat_input("Enter project description or clarification:"):
-    st.session_state.messages.append(HumanMessage(content=prompt))
-    with st.chat_message("user"):
-        st.markdown(prompt)
+graph = get_graph()
+
+async def _stream_graph(inputs, config, items: queue.Queue):
+    """Run the graph on the shared loop, handing each streamed item to the script thread."""
+    try:
+        async for item in graph.astream(inputs, config=config, stream_mode=["custom", "messages", "updates"]):
+            items.put(item)
+    except Exception as e:
+        items.put(("error", e))
+    finally:
+        items.put(None)
+
+# Nodes whose LLM tokens are streamed into the chat; the bubble is then
+# replaced by the node's final message, which is what gets kept
+STREAMED_NODES = {"question_generator"}
+
+def run_turn(prompt: str):
+    """Run the graph for one user message, streaming its output into the page.
 
+    The graph runs on the loop shared by all sessions, so everything that
+    touches the page happens here, on this session's script thread.
+    """
     # Initial run or continue existing run
     config = {"configurable": {"thread_id": "1"}}
     
     # If it's a new conversation or the previous one ended, start fresh
-    if st.session_state.run_id is None or graph.get_state(config) is None:
+    if st.session_state.run_id is None or run_async(graph.aget_state(config)) is None:
         inputs = {"project_context": prompt, "messages": [HumanMessage(content=prompt)]}
         st.session_state.run_id = "1" # Assign a fixed thread_id for simplicity
     else:
         # Continue the existing run with human input
         inputs = {"stakeholder_responses": {"human_input": prompt}, "messages": [HumanMessage(content=prompt)]}
 
+    items = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(_stream_graph(inputs, config, items), get_event_loop())
     try:
-        for s in graph.stream(inputs, config=config):
-            for key, value in s.items():
+        # "custom" carries node status lines, "messages" LLM tokens as they arrive,
+        # and "updates" each node's output
+        stream_id, buffer = None, ""
+        streamed = {}  # node -> chat bubble its tokens were streamed into
+        for mode, chunk in iter(items.get, None):
+            if mode == "error":
+                raise chunk
+            if mode == "custom":
+                st.write(chunk)
+                continue
+            if mode == "messages":
+                token, metadata = chunk
+                node = metadata.get("langgraph_node")
+                if node in STREAMED_NODES and isinstance(token, AIMessageChunk) and token.content:
+                    if token.id != stream_id:
+                        stream_id, buffer = token.id, ""
+                        streamed[node] = st.chat_message("assistant").empty()
+                    buffer += token.content
+                    streamed[node].markdown(buffer)
+                continue
+            for key, value in chunk.items():
                 if key != "__end__":
                     st.write(f"Node: {key}, State: {value}")
                     if "messages" in value:
                         for msg in value["messages"]:
                             if isinstance(msg, AIMessage):
-                                with st.chat_message("assistant"):
-                                    st.markdown(msg.content)
+                                placeholder = streamed.pop(key, None)
+                                if placeholder is not None:
+                                    # Replace the streamed draft with the node's final message
+                                    placeholder.markdown(msg.content)
+                                else:
+                                    with st.chat_message("assistant"):
+                                        st.markdown(msg.content)
                                 st.session_state.messages.append(msg)
     except Exception as e:
         st.error(f"An error occurred: {e}")
         st.session_state.run_id = None # Reset run_id on error to allow starting fresh
+    finally:
+        # Stop the graph run if this script run ends early (rerun, stop, or error);
+        # Streamlit's rerun and stop exceptions bypass the except above
+        future.cancel()
+
+# --- Streamlit UI ---
+st.title("Clarification AI Agent")
+
+if "messages" not in st.session_state:
+    st.session_state.messages = []
+if "run_id" not in st.session_state:
+    st.session_state.run_id = None
+
+for message in st.session_state.messages:
+    with st.chat_message(message.type):
+        st.markdown(message.content)
+
+if prompt := st.chat_input("Enter project description or clarification:"):
+    st.session_state.messages.append(HumanMessage(content=prompt))
+    with st.chat_message("user"):
+        st.markdown(prompt)
+
+    run_turn(prompt)
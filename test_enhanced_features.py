@@ -134,6 +134,50 @@ def test_animations():
         return False
 
 
+def test_exporter():
+    """Test project export and unchanged-export skipping."""
+    print("\nTesting exporter...")
+    
+    import tempfile
+    cwd = os.getcwd()
+    
+    try:
+        from clarification_agent.models.project import Project
+        from clarification_agent.output.exporter import Exporter
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            project = Project(name="demo", mvp_features=["Login"], file_map={"app.py": "Entry point"})
+            
+            Exporter(project).export_all()
+            print("✓ Exported project files")
+            
+            # The apps list every .clarity/*.json file as a project
+            projects = [f[:-5] for f in os.listdir(".clarity") if f.endswith(".json")]
+            assert projects == ["demo"], f"unexpected projects after export: {projects}"
+            print("✓ Project list unchanged by export")
+
+            readme_mtime = os.stat("README.md").st_mtime_ns
+            Exporter(project).export_all()
+            assert os.stat("README.md").st_mtime_ns == readme_mtime, "unchanged README was rewritten"
+            print("✓ Unchanged README skipped")
+            
+            project.mvp_features.append("Search")
+            Exporter(project).export_all()
+            with open("README.md") as f:
+                assert "- Search" in f.read(), "changed README was not rewritten"
+            print("✓ Changed README rewritten")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Exporter test failed: {e}")
+        return False
+        
+    finally:
+        os.chdir(cwd)
+
+
 def main():
     """Run all tests."""
     print("🧪 Testing Enhanced Clarification Agent Components")
@@ -144,7 +188,8 @@ def main():
         test_clarity_validator,
         test_process_tracker,
         test_web_search,
-        test_animations
+        test_animations,
+        test_exporter
     ]
     
     passed = 0
@@ -3,6 +3,7 @@ Configuration settings for the Enhanced Clarification Agent with Web Search
 """
 
 import os
+import re
 from typing import Dict, List
 
 class WebSearchConfig:
@@ -50,6 +51,8 @@ class WebSearchConfig:
         "reviews", "benchmarks", "performance", "speed", "fast",
         "modern", "2024", "2025", "updated", "state of the art"
     ]
+    # All trigger keywords compiled into one alternation, scanned in a single pass
+    _SEARCH_TRIGGER_RE = re.compile("|".join(map(re.escape, SEARCH_TRIGGER_KEYWORDS)))
     
     # Content Extraction Settings
     CONTENT_EXTRACTION = {
@@ -101,8 +104,7 @@ class WebSearchConfig:
     @classmethod
     def should_trigger_search(cls, text: str) -> bool:
         """Check if text contains search trigger keywords"""
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in cls.SEARCH_TRIGGER_KEYWORDS)
+        return cls._SEARCH_TRIGGER_RE.search(text.lower()) is not None
     
     @classmethod
     def get_environment_config(cls) -> Dict[str, str]: